@@ -0,0 +1,93 @@
+"""Startup-time benchmark for the scraper CLI
+
+Runs each case in a fresh interpreter several times and prints the median
+wall time, comparing the old scripts' eager imports with the same work done
+through the lazy entry points:
+
+    python bench_startup.py [--runs 15]
+
+The dashboard is not measured: Streamlit keeps imported modules across
+reruns, so its import time is only paid once per server process.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+OLD_IMPORTS = "import requests; from bs4 import BeautifulSoup; import pandas as pd; "
+HELP = ("import sys; sys.argv = ['cli.py', '--help']; import runpy; "
+        "runpy.run_path('cli.py', run_name='__main__')")
+ROWS = "[{'name': 'a', 'age': '1'}]"
+
+# (label, baseline code, new code) -- both sides do the same work
+CASES = [
+    (
+        # Any real scrape fetches a page, so the new side loads requests/bs4 too
+        "startup up to the first fetch",
+        OLD_IMPORTS,
+        "import cli, transfermarkt, writers; transfermarkt._require()",
+    ),
+    (
+        "CLI --help / argument errors",
+        OLD_IMPORTS + HELP,
+        HELP,
+    ),
+    (
+        "fetch-ready + write rows to CSV",
+        OLD_IMPORTS + f"pd.DataFrame({ROWS}).to_csv(__import__('os').devnull, index=False)",
+        "import transfermarkt; transfermarkt._require(); "
+        f"from writers import write_csv; write_csv({ROWS}, __import__('os').devnull)",
+    ),
+]
+
+
+def time_run(code):
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=HERE,
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        return None
+    return elapsed
+
+
+def median_time(code, runs):
+    times = []
+    for _ in range(runs):
+        elapsed = time_run(code)
+        if elapsed is None:
+            return None
+        times.append(elapsed)
+    return statistics.median(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=15,
+                        help="runs per case (default: 15)")
+    args = parser.parse_args(argv)
+
+    empty = median_time("pass", args.runs)
+    print(f"Python {sys.version.split()[0]}, {args.runs} runs per case, "
+          f"bare interpreter: {empty * 1000:.0f} ms\n")
+    print(f"{'case':<32}{'before':>10}{'after':>10}{'saved':>10}")
+    for label, before_code, after_code in CASES:
+        before = median_time(before_code, args.runs)
+        after = median_time(after_code, args.runs)
+        if before is None or after is None:
+            print(f"{label:<32}{'skipped (missing packages)':>30}")
+            continue
+        saved = before - after
+        print(f"{label:<32}{before * 1000:>8.0f}ms{after * 1000:>8.0f}ms"
+              f"{saved * 1000:>8.0f}ms  ({saved / before:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+"""books.toscrape.com catalogue parsing (from Scraping.ipynb / WebScrape.ipynb)"""
+
+URL = 'https://books.toscrape.com/'
+
+
+def catalogue_url(page):
+    return f'{URL}catalogue/page-{page}.html'
+
+
+def get_book_titles(doc):
+    Book_title_tags = doc.find_all('h3')
+    Book_titles = []
+    for tags in Book_title_tags:
+        Book_titles.append(tags.text)
+    return Book_titles
+
+
+def get_book_price(doc):
+    Book_price_tags = doc.find_all('p', class_ = 'price_color')
+    Book_price = []
+    for tags in Book_price_tags:
+        Book_price.append(tags.text.replace('Â£','€'))
+    return Book_price
+
+
+def get_stock_availability(doc):
+    Book_stock_tags = doc.find_all('p', class_='instock availability')
+    Book_stock = []
+    for tags in Book_stock_tags:
+        Book_stock.append(tags.text.strip())
+    return Book_stock
+
+
+def get_book_url(doc):
+    Book_url = []
+    Book_title_tags = doc.find_all('h3')
+    for article in Book_title_tags:
+        for link in article.find_all('a', href= True):
+            url = link['href']
+            links = URL + url
+            if links not in Book_url:
+                Book_url.append(links)
+    return Book_url
+
+
+def catalogue_is_empty(doc):
+    """A catalogue page without any book price (blank or throttled)"""
+    return doc.find('p', class_='price_color') is None
+
+
+def parse_catalogue(doc):
+    """All books of one catalogue page, as rows with the CSV column names"""
+    return [
+        {"Title": title, "Price": price, "avalaible": dispo, "Link": link}
+        for title, price, dispo, link in zip(
+            get_book_titles(doc), get_book_price(doc),
+            get_stock_availability(doc), get_book_url(doc),
+        )
+    ]
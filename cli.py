@@ -0,0 +1,181 @@
+"""Command line entry point for the Transfermarkt scraper
+
+Usage:
+    python cli.py                       # squad table only (like datascraping.py)
+    python cli.py --details             # + height/foot from each profile page
+    python cli.py --details -o players.jsonl
+    python cli.py --details --fixed-delay   # one profile at a time, 1-2 s apart
+
+Only the standard library is imported at startup; requests/BeautifulSoup are
+loaded when the first page is fetched and pandas is not needed at all.
+"""
+import argparse
+import sys
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Scrape the Morocco national team squad from Transfermarkt"
+    )
+    parser.add_argument("--url", default=None,
+                        help="squad page URL (default: Morocco 2024)")
+    parser.add_argument("--details", action="store_true",
+                        help="also scrape height and foot from each player profile")
+    parser.add_argument("-o", "--output", default="equipe_maroc.csv",
+                        help="output file (.csv or .jsonl, default: equipe_maroc.csv)")
+    parser.add_argument("--format", choices=["csv", "jsonl"], default=None,
+                        help="output format (default: guessed from the extension)")
+    parser.add_argument("--encoding", default="utf-8",
+                        help="output file encoding (default: utf-8)")
+    parser.add_argument("-q", "--quiet", action="store_true",
+                        help="do not print the scraped table")
+    parser.add_argument("--max-concurrency", type=int, default=8,
+                        help="upper bound for concurrent profile requests (default: 8)")
+    parser.add_argument("--fixed-delay", action="store_true",
+                        help="fetch profiles one by one with a fixed 1-2 s delay "
+                             "instead of the adaptive controller")
+    return parser
+
+
+def scrape_basic(url):
+    """Scrape the squad table only"""
+    import time
+    import random
+    import transfermarkt
+
+    rows = transfermarkt.get_squad_rows(url)
+    if rows is None:
+        print("Could not find player table. Page structure may have changed.")
+        return None
+
+    players = []
+    for row in rows:
+        player, _ = transfermarkt.parse_squad_row(row)
+        players.append(player)
+        time.sleep(random.uniform(0.5, 1.2))  # éviter d’être bloqué
+    return players
+
+
+def _scrape_player(idx, total_players, row, base_url, controller=None):
+    """Basic fields + profile details for one squad row, or None on error"""
+    import transfermarkt
+
+    try:
+        player, player_url = transfermarkt.parse_squad_row(row, base_url)
+        name = player["name"]
+        if player_url:
+            player_details = transfermarkt.get_player_details(player_url, controller)
+
+            # Show what was found
+            status = []
+            if player_details["height"] != "N/A":
+                status.append(f"H:{player_details['height']}")
+            if player_details["foot"] != "N/A":
+                status.append(f"F:{player_details['foot']}")
+
+            if status:
+                print(f"[{idx}/{total_players}] Scraping {name}... [{', '.join(status)}]")
+            else:
+                print(f"[{idx}/{total_players}] Scraping {name}... [No extra data found]")
+        else:
+            print(f"[{idx}/{total_players}] {name} - No profile URL")
+            player_details = {
+                "height": "N/A",
+                "foot": "N/A"
+            }
+
+        return {
+            "name": name,
+            "age": player["age"],
+            "position": player["position"],
+            "height": player_details["height"],
+            "foot": player_details["foot"],
+            "market_value": player["market_value"]
+        }
+
+    except Exception as e:
+        print(f"  ✗ Error processing player in row {idx}: {e}")
+        return None
+
+
+def scrape_with_details(url, controller=None):
+    """Scrape the squad table and each player's profile page
+
+    With an AIMDController (throttle.py) profiles are fetched concurrently,
+    at the pace the controller allows; without one they are fetched one by
+    one with a fixed delay.
+    """
+    import transfermarkt
+
+    print("Fetching Morocco team data...")
+    rows = transfermarkt.get_squad_rows(url, controller)
+    if rows is None:
+        print("Could not find player table. Page structure may have changed.")
+        return None
+
+    base_url = transfermarkt.base_url_of(url)
+    total_players = len(rows)
+    print(f"Found {total_players} players. Scraping details...")
+    print("This may take 1-2 minutes...")
+    print()
+
+    if controller is None:
+        results = [
+            _scrape_player(idx, total_players, row, base_url)
+            for idx, row in enumerate(rows, 1)
+        ]
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=controller.max_concurrency) as executor:
+            results = list(executor.map(
+                lambda item: _scrape_player(item[0], total_players, item[1], base_url, controller),
+                enumerate(rows, 1),
+            ))
+        print(f"\nFetch controller: {controller.summary()}")
+    return [player for player in results if player is not None]
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    import transfermarkt
+    from writers import format_table, write_rows
+
+    url = args.url or transfermarkt.URL
+    if args.details:
+        controller = None
+        if not args.fixed_delay:
+            from throttle import AIMDController
+
+            controller = AIMDController(max_concurrency=args.max_concurrency)
+        players = scrape_with_details(url, controller)
+    else:
+        players = scrape_basic(url)
+    if players is None:
+        return 1
+
+    if args.details:
+        print("\n" + "="*80)
+        print("Scraping completed!")
+        print("="*80)
+    if not args.quiet:
+        print(format_table(players))
+
+    write_rows(players, args.output, fmt=args.format, encoding=args.encoding)
+    print(f"\n✓ Data saved to {args.output}")
+    print(f"Total players scraped: {len(players)}")
+
+    if args.details:
+        # Show summary statistics
+        height_found = sum(1 for p in players if p["height"] != "N/A")
+        foot_found = sum(1 for p in players if p["foot"] != "N/A")
+
+        print(f"\nData collection summary:")
+        print(f"  - Height: {height_found}/{len(players)} players")
+        print(f"  - Foot: {foot_found}/{len(players)} players")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,795 @@
+"""Distributed crawl: a shared work queue, a coordinator and workers
+
+The coordinator enqueues squad, profile and catalogue URLs; any number of
+worker processes, on one or several machines, lease tasks from the queue,
+fetch them and write the parsed rows to the shared result sink.
+
+    python crawl.py enqueue --squad                      # Morocco squad page
+    python crawl.py enqueue --catalogue 1-50             # books.toscrape pages
+    python crawl.py worker --processes 4
+    python crawl.py status
+    python crawl.py export players -o equipe_maroc.csv
+
+Across machines, one of them serves the queue file over HTTP and the
+workers (and enqueue/status/export) point at it with --queue:
+
+    python crawl.py serve --host 0.0.0.0 --port 8700     # next to crawl.sqlite
+    python crawl.py --queue http://coordinator:8700 worker --processes 4
+
+Queue backends implement the methods of ``MemoryQueue``:
+
+- ``SQLiteQueue`` (default) keeps tasks, per-host rate limit slots and
+  results in one SQLite file in WAL mode. WAL needs shared memory, so
+  processes opening the file must run on the machine that holds it: do
+  not put it on a network filesystem.
+- ``HTTPQueue`` forwards every call to ``crawl.py serve``, which runs them
+  against a ``SQLiteQueue`` on the machine holding the file. This is what
+  workers on other machines use. There is no authentication: serve on a
+  trusted network only.
+- ``MemoryQueue`` is an in-process stand-in with the same behaviour, for
+  threads in one process and for trying handlers locally.
+
+Squad pages store their rows (name, age, position, market value) as
+results and queue each profile once, keyed on its URL: a player shared by
+several squads is fetched once, and ``export players`` joins every squad
+row with the height and foot of its profile (N/A if that failed). Tasks
+are deduplicated on (kind, URL); ``enqueue --refresh`` queues finished
+tasks again, together with the profiles of the refreshed squads.
+
+A task is leased for ``lease_seconds``. If the worker dies, the lease
+expires and another worker picks the task up. If the handler raises, the
+task is retried until it has been attempted ``max_attempts`` times and is
+then marked ``failed``. The per-host rate limit is enforced through the
+queue, so it holds across all workers, not per process.
+"""
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+DEFAULT_DB = "crawl.sqlite"
+LEASE_SECONDS = 120
+MAX_ATTEMPTS = 3
+HOST_INTERVAL = 1.5   # seconds between two requests to the same host
+
+# Task states
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+
+class Task:
+    """One URL to fetch, with the handler kind and an optional payload"""
+    __slots__ = ("id", "kind", "url", "payload", "attempts")
+
+    def __init__(self, id, kind, url, payload=None, attempts=0):
+        self.id = id
+        self.kind = kind
+        self.url = url
+        self.payload = payload
+        self.attempts = attempts
+
+    def __repr__(self):
+        return f"Task({self.id}, {self.kind!r}, {self.url!r}, attempts={self.attempts})"
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+# ---------------------------------------------------------------------------
+# Queue backends
+# ---------------------------------------------------------------------------
+
+class MemoryQueue:
+    """In-process queue backend (thread-safe)"""
+
+    def __init__(self, max_attempts=MAX_ATTEMPTS):
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._tasks = {}      # id -> [task, state, lease_expires, error, finished]
+        self._ids = {}        # (kind, url) -> id
+        self._hosts = {}
+        self._results = {}    # id -> (kind, rows)
+
+    def put(self, kind, url, payload=None, refresh=None):
+        """Enqueue a task; returns False if this (kind, url) is already queued
+
+        With refresh (a time.time() value), a done or failed task that
+        finished before it is queued again with the new payload.
+        """
+        with self._lock:
+            task_id = self._ids.get((kind, url))
+            if task_id is not None:
+                entry = self._tasks[task_id]
+                if refresh is None or entry[1] not in (DONE, FAILED) or entry[4] >= refresh:
+                    return False
+                entry[:] = [Task(task_id, kind, url, payload), PENDING, 0.0, None, 0.0]
+                return True
+            task_id = len(self._tasks) + 1
+            self._ids[(kind, url)] = task_id
+            self._tasks[task_id] = [Task(task_id, kind, url, payload), PENDING, 0.0, None, 0.0]
+            return True
+
+    def lease(self, worker, lease_seconds=LEASE_SECONDS):
+        """Take the oldest pending (or expired) task, or None"""
+        now = time.time()
+        with self._lock:
+            for entry in self._tasks.values():
+                task, state, expires, _, _ = entry
+                if state == LEASED and expires < now and task.attempts >= self.max_attempts:
+                    entry[1] = FAILED
+                    entry[3] = "lease expired"
+                    entry[4] = now
+                    continue
+                if state == PENDING or (state == LEASED and expires < now):
+                    task.attempts += 1
+                    entry[1] = LEASED
+                    entry[2] = now + lease_seconds
+                    return Task(task.id, task.kind, task.url, task.payload, task.attempts)
+        return None
+
+    def complete(self, task, rows):
+        """Store result rows (replacing those of an earlier run) and mark
+        the task done"""
+        with self._lock:
+            entry = self._tasks[task.id]
+            if entry[1] != LEASED or entry[0].attempts != task.attempts:
+                return
+            entry[1] = DONE
+            entry[3] = None
+            entry[4] = time.time()
+            self._results[task.id] = (task.kind, list(rows))
+
+    def fail(self, task, error):
+        """Give the task back for a retry, or mark it failed"""
+        with self._lock:
+            entry = self._tasks[task.id]
+            if entry[1] != LEASED or entry[0].attempts != task.attempts:
+                return
+            entry[1] = FAILED if task.attempts >= self.max_attempts else PENDING
+            entry[3] = str(error)
+            entry[4] = time.time()
+
+    def reserve_slot(self, host, interval):
+        """Reserve the next request slot for a host; returns seconds to wait"""
+        now = time.time()
+        with self._lock:
+            slot = max(now, self._hosts.get(host, 0.0))
+            self._hosts[host] = slot + interval
+        return slot - now
+
+    def counts(self):
+        with self._lock:
+            counts = {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0}
+            for _, state, _, _, _ in self._tasks.values():
+                counts[state] += 1
+        return counts
+
+    def results(self, kind):
+        with self._lock:
+            return [row for task_id, (k, rows) in sorted(self._results.items())
+                    if k == kind for row in rows]
+
+    def errors(self):
+        with self._lock:
+            return [(e[0], e[3]) for e in self._tasks.values() if e[1] == FAILED]
+
+
+class SQLiteQueue:
+    """Queue backend stored in a SQLite file, shared by worker processes"""
+
+    def __init__(self, path=DEFAULT_DB, max_attempts=MAX_ATTEMPTS):
+        self.path = path
+        self.max_attempts = max_attempts
+        self._con = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.executescript("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY,
+                kind TEXT NOT NULL,
+                url TEXT NOT NULL,
+                payload TEXT,
+                state TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                lease_expires REAL NOT NULL DEFAULT 0,
+                worker TEXT,
+                error TEXT,
+                finished REAL NOT NULL DEFAULT 0,
+                UNIQUE (kind, url)
+            );
+            CREATE INDEX IF NOT EXISTS idx_tasks_state ON tasks (state, lease_expires);
+            CREATE TABLE IF NOT EXISTS hosts (
+                host TEXT PRIMARY KEY,
+                next_slot REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS results (
+                task_id INTEGER NOT NULL,
+                kind TEXT NOT NULL,
+                data TEXT NOT NULL
+            );
+        """)
+        columns = [row[1] for row in self._con.execute("PRAGMA table_info(tasks)")]
+        if "finished" not in columns:
+            # Queue files created before refreshes were supported
+            self._con.execute("ALTER TABLE tasks ADD COLUMN finished REAL NOT NULL DEFAULT 0")
+
+    def close(self):
+        self._con.close()
+
+    def _transaction(self):
+        # BEGIN IMMEDIATE takes the write lock up front so two workers can
+        # never lease the same task or reserve the same host slot
+        self._con.execute("BEGIN IMMEDIATE")
+
+    def put(self, kind, url, payload=None, refresh=None):
+        payload = None if payload is None else json.dumps(payload)
+        cursor = self._con.execute(
+            "INSERT OR IGNORE INTO tasks (kind, url, payload) VALUES (?, ?, ?)",
+            (kind, url, payload),
+        )
+        if cursor.rowcount == 1:
+            return True
+        if refresh is None:
+            return False
+        cursor = self._con.execute(
+            "UPDATE tasks SET state = ?, payload = ?, attempts = 0, lease_expires = 0, "
+            "worker = NULL, error = NULL, finished = 0 "
+            "WHERE kind = ? AND url = ? AND state IN (?, ?) AND finished < ?",
+            (PENDING, payload, kind, url, DONE, FAILED, refresh),
+        )
+        return cursor.rowcount == 1
+
+    def lease(self, worker, lease_seconds=LEASE_SECONDS):
+        now = time.time()
+        self._transaction()
+        try:
+            # A task whose last allowed lease expired (the worker died) is failed
+            self._con.execute(
+                "UPDATE tasks SET state = ?, error = 'lease expired', finished = ? "
+                "WHERE state = ? AND lease_expires < ? AND attempts >= ?",
+                (FAILED, now, LEASED, now, self.max_attempts),
+            )
+            row = self._con.execute(
+                "SELECT id, kind, url, payload, attempts FROM tasks "
+                "WHERE state = ? OR (state = ? AND lease_expires < ?) "
+                "ORDER BY id LIMIT 1", (PENDING, LEASED, now),
+            ).fetchone()
+            if row is None:
+                self._con.execute("COMMIT")
+                return None
+            task_id, kind, url, payload, attempts = row
+            self._con.execute(
+                "UPDATE tasks SET state = ?, attempts = ?, lease_expires = ?, worker = ? "
+                "WHERE id = ?",
+                (LEASED, attempts + 1, now + lease_seconds, worker, task_id),
+            )
+            self._con.execute("COMMIT")
+        except BaseException:
+            self._con.execute("ROLLBACK")
+            raise
+        return Task(task_id, kind, url,
+                    None if payload is None else json.loads(payload), attempts + 1)
+
+    def complete(self, task, rows):
+        self._transaction()
+        try:
+            # Only the current lease holder may complete: a worker whose lease
+            # expired and was re-leased must not write duplicate results
+            cursor = self._con.execute(
+                "UPDATE tasks SET state = ?, error = NULL, finished = ? "
+                "WHERE id = ? AND state = ? AND attempts = ?",
+                (DONE, time.time(), task.id, LEASED, task.attempts),
+            )
+            if cursor.rowcount == 1:
+                # A refreshed task replaces the rows of its previous run
+                self._con.execute("DELETE FROM results WHERE task_id = ?", (task.id,))
+                self._con.executemany(
+                    "INSERT INTO results (task_id, kind, data) VALUES (?, ?, ?)",
+                    [(task.id, task.kind, json.dumps(row, ensure_ascii=False))
+                     for row in rows],
+                )
+            self._con.execute("COMMIT")
+        except BaseException:
+            self._con.execute("ROLLBACK")
+            raise
+
+    def fail(self, task, error):
+        state = FAILED if task.attempts >= self.max_attempts else PENDING
+        self._con.execute(
+            "UPDATE tasks SET state = ?, error = ?, finished = ? "
+            "WHERE id = ? AND state = ? AND attempts = ?",
+            (state, str(error), time.time(), task.id, LEASED, task.attempts),
+        )
+
+    def reserve_slot(self, host, interval):
+        now = time.time()
+        self._transaction()
+        try:
+            row = self._con.execute(
+                "SELECT next_slot FROM hosts WHERE host = ?", (host,)
+            ).fetchone()
+            slot = max(now, row[0] if row else 0.0)
+            self._con.execute(
+                "INSERT OR REPLACE INTO hosts (host, next_slot) VALUES (?, ?)",
+                (host, slot + interval),
+            )
+            self._con.execute("COMMIT")
+        except BaseException:
+            self._con.execute("ROLLBACK")
+            raise
+        return slot - now
+
+    def counts(self):
+        counts = {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        for state, n in self._con.execute(
+            "SELECT state, COUNT(*) FROM tasks GROUP BY state"
+        ):
+            counts[state] = n
+        return counts
+
+    def results(self, kind):
+        return [
+            json.loads(data) for (data,) in self._con.execute(
+                "SELECT data FROM results WHERE kind = ? ORDER BY task_id, rowid", (kind,)
+            )
+        ]
+
+    def errors(self):
+        return [
+            (Task(row[0], row[1], row[2], None if row[3] is None else json.loads(row[3])),
+             row[4])
+            for row in self._con.execute(
+                "SELECT id, kind, url, payload, error FROM tasks WHERE state = ?",
+                (FAILED,),
+            )
+        ]
+
+
+class HTTPQueue:
+    """Queue backend talking to `crawl.py serve` (see queue_server)"""
+
+    def __init__(self, url, timeout=60):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.max_attempts = self._call("max_attempts")
+
+    def close(self):
+        pass
+
+    def _call(self, method, *args):
+        import urllib.request
+
+        request = urllib.request.Request(
+            f"{self.url}/{method}", data=json.dumps({"args": args}).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read())["result"]
+
+    def put(self, kind, url, payload=None, refresh=None):
+        return self._call("put", kind, url, payload, refresh)
+
+    def lease(self, worker, lease_seconds=LEASE_SECONDS):
+        task = self._call("lease", worker, lease_seconds)
+        return None if task is None else Task(**task)
+
+    def complete(self, task, rows):
+        self._call("complete", task.as_dict(), rows)
+
+    def fail(self, task, error):
+        self._call("fail", task.as_dict(), str(error))
+
+    def reserve_slot(self, host, interval):
+        # The wait is computed on the server's clock, so clock skew between
+        # machines does not matter
+        return self._call("reserve_slot", host, interval)
+
+    def counts(self):
+        return self._call("counts")
+
+    def results(self, kind):
+        return self._call("results", kind)
+
+    def errors(self):
+        return [(Task(**task), error) for task, error in self._call("errors")]
+
+
+def queue_server(queue, host="127.0.0.1", port=8700):
+    """HTTP server exposing a queue backend to HTTPQueue clients
+
+    Requests are handled one at a time (every call is a short transaction),
+    which also keeps the SQLite connection on the serving thread.
+    """
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    def encode(method, result):
+        if method == "lease":
+            return None if result is None else result.as_dict()
+        if method == "errors":
+            return [(task.as_dict(), error) for task, error in result]
+        return result
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            method = self.path.strip("/")
+            length = int(self.headers.get("Content-Length") or 0)
+            args = json.loads(self.rfile.read(length) or b"{}").get("args", [])
+            if method == "max_attempts":
+                result = queue.max_attempts
+            elif method in ("put", "lease", "reserve_slot", "counts", "results", "errors"):
+                result = getattr(queue, method)(*args)
+            elif method in ("complete", "fail"):
+                result = getattr(queue, method)(Task(**args[0]), *args[1:])
+            else:
+                self.send_error(404, f"Unknown queue method {method!r}")
+                return
+            body = json.dumps({"result": encode(method, result)},
+                              ensure_ascii=False).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return HTTPServer((host, port), Handler)
+
+
+def open_queue(location):
+    """HTTPQueue for an http(s):// URL, SQLiteQueue for a file path"""
+    if location.startswith(("http://", "https://")):
+        return HTTPQueue(location)
+    return SQLiteQueue(location)
+
+
+# ---------------------------------------------------------------------------
+# Fetching and task handlers
+# ---------------------------------------------------------------------------
+
+class RateLimitedFetcher:
+    """Fetch pages through the queue's shared per-host rate limit
+
+    With an AIMDController (throttle.py) the worker also slows down on its
+    own when it sees 429/503 responses, rising latency or pages that
+    ``is_empty`` rejects. The controller slot is taken first and the shared
+    host slot reserved inside it, so a backing-off worker does not hold
+    host slots it cannot use yet. The shared interval stays the minimum
+    spacing.
+    """
+
+    def __init__(self, queue, interval=HOST_INTERVAL, get=None, controller=None):
+        self.queue = queue
+        self.interval = interval
+        self.controller = controller
+        if get is None:
+            # Import requests/bs4 now, not between reserving a slot and using it
+            import transfermarkt
+
+            transfermarkt._require()
+            get = http_get
+        self._get = get
+
+    def __call__(self, url, is_empty=None):
+        """Fetch url; is_empty(page) flags a throttled page (controller only)"""
+        if self.controller is not None:
+            return self.controller.call(self._get, url, is_empty=is_empty,
+                                        before=lambda: self._wait_for_slot(url))
+        self._wait_for_slot(url)
+        return self._get(url)
+
+    def _wait_for_slot(self, url):
+        wait = self.queue.reserve_slot(urlsplit(url).netloc, self.interval)
+        if wait > 0:
+            time.sleep(wait)
+
+
+def http_get(url):
+    """Download a page and parse it; HTTP errors raise so the task is retried"""
+    import transfermarkt
+
+    return transfermarkt.fetch_soup(url)
+
+
+def handle_squad(task, fetch, queue):
+    """Squad page -> one row per player; profiles are queued once per URL
+    and joined back on export (see export_players)"""
+    import transfermarkt
+
+    soup = fetch(task.url, transfermarkt.squad_is_empty)
+    table = soup.find("table", {"class": "items"})
+    if not table:
+        raise ValueError("Could not find player table. Page structure may have changed.")
+    refresh = (task.payload or {}).get("refresh")
+    rows = []
+    base_url = transfermarkt.base_url_of(task.url)
+    for row in table.find_all("tr", {"class": ["odd", "even"]}):
+        player, player_url = transfermarkt.parse_squad_row(row, base_url)
+        if player_url:
+            queue.put("profile", player_url, refresh=refresh)
+        rows.append(dict(player, profile_url=player_url, squad=task.url))
+    return rows
+
+
+def handle_profile(task, fetch, queue):
+    """Profile page -> height and foot, keyed on the profile URL
+
+    On the last attempt a page that still looks empty is parsed anyway, as
+    cli.py does. A profile that keeps failing leaves its squad rows with
+    N/A details (see export_players).
+    """
+    import transfermarkt
+    from throttle import Throttled
+
+    try:
+        soup = fetch(task.url, transfermarkt.profile_is_empty)
+    except Throttled as e:
+        if task.attempts < queue.max_attempts or e.result is None:
+            raise
+        soup = e.result
+    details = transfermarkt.parse_player_details(soup)
+    header = soup.find("h1")
+    return [{
+        "profile_url": task.url,
+        "name": header.get_text(strip=True) if header else None,
+        "height": details["height"],
+        "foot": details["foot"],
+    }]
+
+
+def handle_catalogue(task, fetch, queue):
+    """books.toscrape catalogue page -> one row per book"""
+    import books
+
+    rows = books.parse_catalogue(fetch(task.url, books.catalogue_is_empty))
+    if not rows:
+        raise ValueError("No books found on catalogue page")
+    return rows
+
+
+HANDLERS = {
+    "squad": handle_squad,
+    "profile": handle_profile,
+    "catalogue": handle_catalogue,
+}
+
+
+def export_players(queue):
+    """Every squad row with the height and foot of its profile page (N/A if
+    the profile was not fetched), then profiles queued on their own"""
+    profiles = {row["profile_url"]: row for row in queue.results("profile")}
+    players = []
+    joined = set()
+    for row in queue.results("squad"):
+        profile = profiles.get(row["profile_url"], {})
+        joined.add(row["profile_url"])
+        players.append({
+            "name": row["name"],
+            "age": row["age"],
+            "position": row["position"],
+            "height": profile.get("height", "N/A"),
+            "foot": profile.get("foot", "N/A"),
+            "market_value": row["market_value"],
+            "squad": row["squad"],
+        })
+    for url, profile in profiles.items():
+        if url not in joined:
+            players.append({"name": profile["name"], "age": "N/A", "position": "N/A",
+                            "height": profile["height"], "foot": profile["foot"],
+                            "market_value": "N/A", "squad": None})
+    return players
+
+
+def export_books(queue):
+    return queue.results("catalogue")
+
+
+EXPORTS = {
+    "players": export_players,
+    "books": export_books,
+}
+
+
+# ---------------------------------------------------------------------------
+# Worker
+# ---------------------------------------------------------------------------
+
+def run_worker(queue, worker=None, fetch=None, handlers=HANDLERS,
+               lease_seconds=LEASE_SECONDS, poll=1.0, exit_when_empty=True,
+               log=print):
+    """Lease and process tasks until the queue is drained
+
+    With exit_when_empty=False the worker keeps polling for new tasks.
+    Returns the number of tasks this worker completed.
+    """
+    worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+    fetch = fetch or RateLimitedFetcher(queue)
+    completed = 0
+    while True:
+        task = queue.lease(worker, lease_seconds)
+        if task is None:
+            counts = queue.counts()
+            if exit_when_empty and counts[PENDING] == 0 and counts[LEASED] == 0:
+                return completed
+            time.sleep(poll)
+            continue
+        try:
+            rows = handlers[task.kind](task, fetch, queue)
+        except Exception as e:
+            log(f"[{worker}] ✗ {task.kind} {task.url} (attempt {task.attempts}): {e}")
+            queue.fail(task, e)
+            continue
+        queue.complete(task, rows)
+        completed += 1
+        log(f"[{worker}] ✓ {task.kind} {task.url} ({len(rows)} rows)")
+
+
+def _worker_process(location, interval, lease_seconds, exit_when_empty, adaptive=False,
+                    threads=1):
+    """One worker process running `threads` workers, each with its own
+    connection; with adaptive=True they share one AIMDController that lets
+    1 to `threads` requests run at once"""
+    controller = None
+    if adaptive:
+        from throttle import AIMDController
+
+        controller = AIMDController(initial=1, max_concurrency=threads)
+
+    def work(worker):
+        queue = open_queue(location)
+        try:
+            fetch = RateLimitedFetcher(queue, interval, controller=controller)
+            run_worker(queue, worker, fetch=fetch, lease_seconds=lease_seconds,
+                       exit_when_empty=exit_when_empty)
+        finally:
+            queue.close()
+
+    name = f"{socket.gethostname()}:{os.getpid()}"
+    if threads == 1:
+        work(name)
+        return
+    workers = [threading.Thread(target=work, args=(f"{name}/{i}",))
+               for i in range(1, threads + 1)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+
+# ---------------------------------------------------------------------------
+# Command line
+# ---------------------------------------------------------------------------
+
+def _page_range(text):
+    first, _, last = text.partition("-")
+    return range(int(first), int(last or first) + 1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Distributed crawl coordinator/worker")
+    parser.add_argument("--db", default=DEFAULT_DB,
+                        help=f"shared queue database (default: {DEFAULT_DB})")
+    parser.add_argument("--queue", default=None, metavar="URL",
+                        help="use the queue served by `crawl.py serve` at URL "
+                             "instead of --db")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = sub.add_parser("enqueue", help="add URLs to the queue (coordinator)")
+    enqueue.add_argument("--squad", nargs="?", const="", default=None, metavar="URL",
+                         help="squad page URL (default: Morocco 2024)")
+    enqueue.add_argument("--profile", action="append", default=[], metavar="URL",
+                         help="player profile URL (repeatable)")
+    enqueue.add_argument("--catalogue", default=None, metavar="PAGES",
+                         help="books.toscrape catalogue pages, e.g. 1-50")
+    enqueue.add_argument("--refresh", action="store_true",
+                         help="queue done/failed tasks again, with the profiles "
+                              "of refreshed squads")
+
+    worker = sub.add_parser("worker", help="process tasks")
+    worker.add_argument("--processes", type=int, default=1)
+    worker.add_argument("--threads", type=int, default=1,
+                        help="workers per process; requests overlap when a page "
+                             "takes longer than --interval (default: 1)")
+    worker.add_argument("--interval", type=float, default=HOST_INTERVAL,
+                        help=f"seconds between requests per host, across all workers "
+                             f"(default: {HOST_INTERVAL})")
+    worker.add_argument("--lease", type=float, default=LEASE_SECONDS,
+                        help=f"lease duration in seconds (default: {LEASE_SECONDS})")
+    worker.add_argument("--forever", action="store_true",
+                        help="keep polling when the queue is empty")
+    worker.add_argument("--adaptive", action="store_true",
+                        help="back off on 429/503, rising latency and empty pages "
+                             "(throttle.py)")
+
+    sub.add_parser("status", help="task counts and failures")
+
+    serve = sub.add_parser("serve", help="serve --db over HTTP to workers on other machines")
+    serve.add_argument("--host", default="127.0.0.1",
+                       help="address to listen on, e.g. 0.0.0.0 (default: 127.0.0.1)")
+    serve.add_argument("--port", type=int, default=8700)
+
+    export = sub.add_parser("export", help="write results to CSV/JSONL")
+    export.add_argument("what", choices=sorted(EXPORTS))
+    export.add_argument("-o", "--output", required=True)
+
+    args = parser.parse_args(argv)
+    location = args.queue or args.db
+    if args.command == "serve":
+        if args.queue:
+            parser.error("serve works on a local --db, not on --queue")
+        queue = SQLiteQueue(args.db)
+        server = queue_server(queue, args.host, args.port)
+        print(f"Serving {args.db} on http://{args.host}:{server.server_address[1]}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        server.server_close()
+        queue.close()
+        return 0
+    queue = open_queue(location)
+
+    if args.command == "enqueue":
+        import books
+        import transfermarkt
+
+        refresh = time.time() if args.refresh else None
+        added = 0
+        if args.squad is not None:
+            added += queue.put("squad", args.squad or transfermarkt.URL,
+                               {"refresh": refresh} if refresh else None, refresh)
+        for url in args.profile:
+            added += queue.put("profile", url, refresh=refresh)
+        if args.catalogue:
+            for page in _page_range(args.catalogue):
+                added += queue.put("catalogue", books.catalogue_url(page), refresh=refresh)
+        print(f"✓ {added} tasks added to {location}")
+
+    elif args.command == "worker":
+        queue.close()
+        if args.processes == 1:
+            _worker_process(location, args.interval, args.lease, not args.forever,
+                            args.adaptive, args.threads)
+        else:
+            import multiprocessing
+
+            processes = [
+                multiprocessing.Process(
+                    target=_worker_process,
+                    args=(location, args.interval, args.lease, not args.forever,
+                          args.adaptive, args.threads),
+                )
+                for _ in range(args.processes)
+            ]
+            for p in processes:
+                p.start()
+            for p in processes:
+                p.join()
+        return 0
+
+    elif args.command == "status":
+        counts = queue.counts()
+        print(", ".join(f"{state}: {n}" for state, n in counts.items()))
+        for task, error in queue.errors():
+            print(f"  ✗ {task.kind} {task.url}: {error}")
+
+    elif args.command == "export":
+        from writers import write_rows
+
+        rows = EXPORTS[args.what](queue)
+        write_rows(rows, args.output)
+        print(f"✓ {len(rows)} rows written to {args.output}")
+
+    queue.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,9 @@
+import os
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import plotly.graph_objects as go
+
+from query import COLUMN_NAMES, Filters, PlayerStore, build_store
 
 # Page configuration
 st.set_page_config(
@@ -14,82 +16,103 @@ st.set_page_config(
 st.title("🇲🇦 Morocco National Team Dashboard")
 st.markdown("---")
 
-# Load data
-@st.cache_data
-def load_data():
+# Data store: the CSV is parsed once into a store (SQLite file or Parquet
+# directory, see query.py) and every widget below only fetches the
+# aggregates / rows it draws. PLAYER_STORE and PLAYER_CSV override the
+# paths; with PLAYER_CSV="" a store built by `query.py build` is opened as is.
+CSV_PATH = os.environ.get("PLAYER_CSV", "equipe_maroc.csv")
+STORE_PATH = os.environ.get("PLAYER_STORE", "equipe_maroc.sqlite")
+MAX_POINTS = 5000   # rows pulled for scatter/box plots
+ROW_LIMIT = 1000    # rows shown in the data table
+
+def store_mtime(path):
+    """Modification time of a store file, or of the newest file of a Parquet directory"""
+    if os.path.isdir(path):
+        return max((os.path.getmtime(os.path.join(path, name)) for name in os.listdir(path)),
+                   default=os.path.getmtime(path))
+    return os.path.getmtime(path)
+
+# One connection per store version, shared by all sessions and reruns; a
+# rebuilt store gets a new key and the old connection is dropped
+@st.cache_resource(max_entries=1)
+def get_store(store_path, store_mtime):
+    return PlayerStore(store_path)
+
+def open_store():
+    if CSV_PATH and os.path.exists(CSV_PATH):
+        if not os.path.exists(STORE_PATH) or store_mtime(STORE_PATH) < os.path.getmtime(CSV_PATH):
+            build_store([CSV_PATH], STORE_PATH)
+    elif not os.path.exists(STORE_PATH):
+        st.error(f"❌ Neither '{CSV_PATH}' nor the store '{STORE_PATH}' was found! "
+                 "Please run the scraper first.")
+        return None
     try:
-        df = pd.read_csv("equipe_maroc.csv")
-        
-        # Clean market value column
-        df['market_value_numeric'] = df['market_value'].replace('-', '0')
-        df['market_value_numeric'] = df['market_value_numeric'].str.replace('€', '')
-        df['market_value_numeric'] = df['market_value_numeric'].str.replace('m', '000000')
-        df['market_value_numeric'] = df['market_value_numeric'].str.replace('k', '000')
-        df['market_value_numeric'] = pd.to_numeric(df['market_value_numeric'], errors='coerce')
-        
-        # Extract age as number
-        df['age_numeric'] = df['age'].str.extract(r'\((\d+)\)')[0]
-        df['age_numeric'] = pd.to_numeric(df['age_numeric'], errors='coerce')
-        
-        # Clean height
-        df['height_numeric'] = df['height'].str.extract(r'(\d+[,\.]\d+)')[0]
-        df['height_numeric'] = df['height_numeric'].str.replace(',', '.')
-        df['height_numeric'] = pd.to_numeric(df['height_numeric'], errors='coerce')
-        
-        return df
-    except FileNotFoundError:
-        st.error("❌ File 'equipe_maroc.csv' not found! Please run the scraper first.")
+        return get_store(STORE_PATH, store_mtime(STORE_PATH))
+    except FileNotFoundError as e:
+        st.error(f"❌ {e}")
         return None
 
-df = load_data()
+def frame(rows, columns=None):
+    return pd.DataFrame(rows, columns=columns)
 
-if df is not None:
+store = open_store()
+
+if store is not None:
     # Sidebar filters
     st.sidebar.header("🔍 Filters")
     
+    # Source filter: one source per loaded CSV (team / season)
+    sources = store.distinct('source')
+    selected_source = 'All'
+    if len(sources) > 1:
+        selected_source = st.sidebar.selectbox("Team / season", sources + ['All'])
+    source_filter = Filters(source=None if selected_source == 'All' else selected_source)
+    if selected_source != 'All':
+        st.caption(f"📁 Source: {selected_source}")
+    elif len(sources) > 1:
+        st.caption(f"📁 All sources: {', '.join(sources)}")
+    
     # Position filter
-    positions = ['All'] + sorted(df['position'].dropna().unique().tolist())
+    positions = ['All'] + store.distinct('position', source_filter)
     selected_position = st.sidebar.selectbox("Position", positions)
     
     # Age filter
-    if df['age_numeric'].notna().any():
-        min_age = int(df['age_numeric'].min())
-        max_age = int(df['age_numeric'].max())
+    age_bounds = store.age_bounds(source_filter)
+    age_range = None
+    if age_bounds is not None and age_bounds[0] < age_bounds[1]:
+        min_age, max_age = age_bounds
         age_range = st.sidebar.slider("Age Range", min_age, max_age, (min_age, max_age))
     
     # Foot filter
-    feet = ['All'] + sorted(df['foot'].dropna().unique().tolist())
+    feet = ['All'] + store.distinct('foot', source_filter)
     selected_foot = st.sidebar.selectbox("Preferred Foot", feet)
     
-    # Apply filters
-    filtered_df = df.copy()
-    if selected_position != 'All':
-        filtered_df = filtered_df[filtered_df['position'] == selected_position]
-    if df['age_numeric'].notna().any():
-        filtered_df = filtered_df[
-            (filtered_df['age_numeric'] >= age_range[0]) & 
-            (filtered_df['age_numeric'] <= age_range[1])
-        ]
-    if selected_foot != 'All':
-        filtered_df = filtered_df[filtered_df['foot'] == selected_foot]
+    # Filters are applied by the query engine
+    filters = Filters(
+        position=None if selected_position == 'All' else selected_position,
+        foot=None if selected_foot == 'All' else selected_foot,
+        age_range=age_range,
+        source=source_filter.source,
+    )
+    summary = store.summary(filters)
     
     # Key metrics
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Total Players", len(filtered_df))
+        st.metric("Total Players", summary['players'])
     
     with col2:
-        avg_age = filtered_df['age_numeric'].mean()
-        st.metric("Average Age", f"{avg_age:.1f}" if not pd.isna(avg_age) else "N/A")
+        avg_age = summary['avg_age']
+        st.metric("Average Age", f"{avg_age:.1f}" if avg_age is not None else "N/A")
     
     with col3:
-        total_value = filtered_df['market_value_numeric'].sum() / 1_000_000
+        total_value = summary['total_value'] / 1_000_000
         st.metric("Total Market Value", f"€{total_value:.1f}M")
     
     with col4:
-        avg_height = filtered_df['height_numeric'].mean()
-        st.metric("Average Height", f"{avg_height:.2f}m" if not pd.isna(avg_height) else "N/A")
+        avg_height = summary['avg_height']
+        st.metric("Average Height", f"{avg_height:.2f}m" if avg_height is not None else "N/A")
     
     st.markdown("---")
     
@@ -102,10 +125,11 @@ if df is not None:
         with col1:
             # Position distribution
             st.subheader("Players by Position")
-            position_counts = filtered_df['position'].value_counts()
+            position_counts = frame(store.group_by('position', filters), ['position', 'value'])
             fig_position = px.pie(
-                values=position_counts.values,
-                names=position_counts.index,
+                position_counts,
+                values='value',
+                names='position',
                 title="Position Distribution",
                 hole=0.4
             )
@@ -114,23 +138,25 @@ if df is not None:
         with col2:
             # Foot preference
             st.subheader("Preferred Foot Distribution")
-            foot_counts = filtered_df['foot'].value_counts()
+            foot_counts = frame(store.group_by('foot', filters), ['foot', 'value'])
             fig_foot = px.bar(
-                x=foot_counts.index,
-                y=foot_counts.values,
-                labels={'x': 'Foot', 'y': 'Number of Players'},
+                foot_counts,
+                x='foot',
+                y='value',
+                labels={'foot': 'Foot', 'value': 'Number of Players'},
                 title="Foot Preference",
-                color=foot_counts.index
+                color='foot'
             )
             st.plotly_chart(fig_foot, use_container_width=True)
         
         # Age distribution
         st.subheader("Age Distribution")
-        fig_age = px.histogram(
-            filtered_df,
+        age_counts = frame(store.group_by('age_numeric', filters), ['age_numeric', 'value'])
+        fig_age = px.bar(
+            age_counts.sort_values('age_numeric'),
             x='age_numeric',
-            nbins=15,
-            labels={'age_numeric': 'Age', 'count': 'Number of Players'},
+            y='value',
+            labels={'age_numeric': 'Age', 'value': 'Number of Players'},
             title="Player Age Distribution"
         )
         st.plotly_chart(fig_age, use_container_width=True)
@@ -139,9 +165,11 @@ if df is not None:
         st.subheader("Market Value Analysis")
         
         # Top 10 most valuable players
-        top_10 = filtered_df.nlargest(10, 'market_value_numeric')[
-    ['name', 'market_value', 'market_value_numeric', 'position', 'age']
-]
+        top_10 = frame(
+            store.top_n(10, filters=filters,
+                        columns=['name', 'market_value', 'market_value_numeric', 'position', 'age']),
+            ['name', 'market_value', 'market_value_numeric', 'position', 'age']
+        )
 
         
         fig_top10 = px.bar(
@@ -163,37 +191,59 @@ if df is not None:
         
         with col1:
             st.subheader("Market Value by Position")
-            value_by_position = filtered_df.groupby('position')['market_value_numeric'].sum().sort_values(ascending=False)
+            value_by_position = frame(
+                store.group_by('position', filters, agg='sum', value='market_value_numeric'),
+                ['position', 'value']
+            )
+            value_by_position['value'] /= 1_000_000
             fig_position_value = px.bar(
-                x=value_by_position.index,
-                y=value_by_position.values / 1_000_000,
-                labels={'x': 'Position', 'y': 'Total Value (€M)'},
+                value_by_position,
+                x='position',
+                y='value',
+                labels={'position': 'Position', 'value': 'Total Value (€M)'},
                 title="Total Market Value by Position"
             )
             st.plotly_chart(fig_position_value, use_container_width=True)
         
         with col2:
             st.subheader("Average Value by Position")
-            avg_value_by_position = filtered_df.groupby('position')['market_value_numeric'].mean().sort_values(ascending=False)
+            avg_value_by_position = frame(
+                store.group_by('position', filters, agg='avg', value='market_value_numeric'),
+                ['position', 'value']
+            )
+            avg_value_by_position['value'] /= 1_000_000
             fig_avg_position_value = px.bar(
-                x=avg_value_by_position.index,
-                y=avg_value_by_position.values / 1_000_000,
-                labels={'x': 'Position', 'y': 'Average Value (€M)'},
+                avg_value_by_position,
+                x='position',
+                y='value',
+                labels={'position': 'Position', 'value': 'Average Value (€M)'},
                 title="Average Market Value by Position",
-                color=avg_value_by_position.values
+                color='value'
             )
             st.plotly_chart(fig_avg_position_value, use_container_width=True)
     
     with tab3:
         st.subheader("Physical Statistics")
         
+        # Row-level points for the box/scatter plots, capped at MAX_POINTS
+        points_df = frame(
+            store.players(filters, limit=MAX_POINTS,
+                          columns=['name', 'position', 'foot', 'height', 'market_value',
+                                   'age_numeric', 'height_numeric', 'market_value_numeric']),
+            ['name', 'position', 'foot', 'height', 'market_value',
+             'age_numeric', 'height_numeric', 'market_value_numeric']
+        )
+        points_df['market_value_numeric'] = points_df['market_value_numeric'].fillna(0)
+        if summary['players'] > MAX_POINTS:
+            st.caption(f"Showing {MAX_POINTS} of {summary['players']} players")
+        
         col1, col2 = st.columns(2)
         
         with col1:
             # Height distribution
             st.subheader("Height Distribution")
             fig_height = px.box(
-                filtered_df,
+                points_df,
                 y='height_numeric',
                 x='position',
                 labels={'height_numeric': 'Height (m)', 'position': 'Position'},
@@ -205,7 +255,7 @@ if df is not None:
             # Age vs Market Value scatter
             st.subheader("Age vs Market Value")
             fig_scatter = px.scatter(
-                filtered_df,
+                points_df,
                 x='age_numeric',
                 y='market_value_numeric',
                 size='market_value_numeric',
@@ -222,7 +272,7 @@ if df is not None:
         # Height vs Age scatter
         st.subheader("Height vs Age Analysis")
         fig_height_age = px.scatter(
-            filtered_df[filtered_df['height_numeric'].notna()],
+            points_df[points_df['height_numeric'].notna()],
             x='age_numeric',
             y='height_numeric',
             color='position',
@@ -241,31 +291,47 @@ if df is not None:
         # Search functionality
         search_term = st.text_input("🔍 Search player by name", "")
         
-        display_df = filtered_df.copy()
-        if search_term:
-            display_df = display_df[display_df['name'].str.contains(search_term, case=False, na=False)]
-        
         # Select columns to display
         columns_to_show = st.multiselect(
             "Select columns to display",
-            options=df.columns.tolist(),
+            options=COLUMN_NAMES,
             default=['name', 'age', 'position', 'height', 'foot', 'market_value']
         )
         
+        search_filters = Filters(
+            position=filters.position,
+            foot=filters.foot,
+            age_range=filters.age_range,
+            name=search_term or None,
+            source=filters.source,
+        )
+        matching = store.summary(search_filters)['players']
+        display_df = frame(
+            store.players(search_filters, columns=columns_to_show, limit=ROW_LIMIT)
+            if columns_to_show else [],
+            columns_to_show
+        )
+        if matching > ROW_LIMIT:
+            st.caption(f"Showing the first {ROW_LIMIT} of {matching} players (download for all)")
+        
         st.dataframe(
-            display_df[columns_to_show],
+            display_df,
             use_container_width=True,
             height=500
         )
         
-        # Download button
-        csv = display_df.to_csv(index=False)
-        st.download_button(
-            label="📥 Download filtered data as CSV",
-            data=csv,
-            file_name="morocco_team_filtered.csv",
-            mime="text/csv"
-        )
+        # Download: the full result is only queried once asked for
+        if columns_to_show and st.button("📦 Prepare CSV download"):
+            csv = frame(
+                store.players(search_filters, columns=columns_to_show),
+                columns_to_show
+            ).to_csv(index=False)
+            st.download_button(
+                label=f"📥 Download filtered data as CSV ({matching} players)",
+                data=csv,
+                file_name="morocco_team_filtered.csv",
+                mime="text/csv"
+            )
     
     # Footer
     st.markdown("---")
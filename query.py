@@ -0,0 +1,336 @@
+"""Query layer over the scraped player data
+
+The scraper CSVs are parsed once (see records.py) into a store, and the
+dashboard asks the store for the small result sets it renders instead of
+loading everything into pandas. Two stores share the same SQL:
+
+- SQLite file (``.sqlite`` / ``.db``), standard library only, indexed on
+  position, foot and age.
+- Directory of Parquet files, one per source CSV, queried with DuckDB.
+
+Every load is tagged with a ``source`` (the CSV file name without extension
+by default, e.g. one per team/season) and re-loading a source replaces its
+rows, so the history can grow one file at a time.
+
+    python query.py build equipe_maroc.csv -o equipe_maroc.sqlite
+    python query.py build data/*.csv -o store/      # Parquet directory
+    python query.py top equipe_maroc.sqlite --n 5
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+
+from records import parse_age, parse_category, parse_height, parse_market_value
+
+TABLE = "players"
+
+# (column, SQL type); raw strings are kept for display next to parsed values
+COLUMNS = [
+    ("source", "TEXT"),
+    ("name", "TEXT"),
+    ("age", "TEXT"),
+    ("position", "TEXT"),
+    ("height", "TEXT"),
+    ("foot", "TEXT"),
+    ("market_value", "TEXT"),
+    ("age_numeric", "INTEGER"),
+    ("height_numeric", "DOUBLE"),
+    ("market_value_numeric", "DOUBLE"),
+]
+COLUMN_NAMES = [name for name, _ in COLUMNS]
+
+# Columns the dashboard may group by or sort on
+GROUP_COLUMNS = ("position", "foot", "age_numeric", "source")
+NUMERIC_COLUMNS = ("age_numeric", "height_numeric", "market_value_numeric")
+AGGREGATES = {"count": "COUNT(*)", "sum": "SUM({})", "avg": "AVG({})",
+              "min": "MIN({})", "max": "MAX({})"}
+
+
+# ---------------------------------------------------------------------------
+# Building the store
+# ---------------------------------------------------------------------------
+
+def parse_rows(csv_path, source=None):
+    """Read a scraper CSV and yield store rows with parsed numeric columns"""
+    import csv
+
+    source = source_of(csv_path, source)
+    with open(csv_path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            _, age = parse_age(row.get("age"))
+            yield (
+                source,
+                row.get("name"),
+                row.get("age"),
+                parse_category(row.get("position")),
+                row.get("height"),
+                parse_category(row.get("foot")),
+                row.get("market_value"),
+                age,
+                parse_height(row.get("height")),
+                parse_market_value(row.get("market_value")),
+            )
+
+
+def is_parquet_store(path, fmt=None):
+    """A Parquet store is a directory: existing, ending with a path
+    separator, or named *.parquet; fmt ("sqlite"/"parquet") overrides"""
+    if fmt is not None:
+        return fmt == "parquet"
+    return (os.path.isdir(path) or path.endswith(("/", os.sep))
+            or path.rstrip("/" + os.sep).endswith(".parquet"))
+
+
+def build_sqlite(rows, db_path, sources=None):
+    """Write rows to a SQLite store, replacing `sources` (default: the
+    sources found in rows)"""
+    rows = list(rows)
+    if sources is None:
+        sources = {row[0] for row in rows}
+    con = sqlite3.connect(db_path)
+    with con:
+        con.execute(f"CREATE TABLE IF NOT EXISTS {TABLE} ("
+                    + ", ".join(f"{n} {t}" for n, t in COLUMNS) + ")")
+        for column in ("position", "foot", "age_numeric", "source"):
+            con.execute(f"CREATE INDEX IF NOT EXISTS idx_{TABLE}_{column} "
+                        f"ON {TABLE} ({column})")
+        for source in sources:
+            con.execute(f"DELETE FROM {TABLE} WHERE source = ?", (source,))
+        con.executemany(f"INSERT INTO {TABLE} VALUES ("
+                        + ", ".join("?" * len(COLUMNS)) + ")", rows)
+    con.close()
+
+
+def build_parquet(rows, store_dir, sources=None):
+    """Write one Parquet file per source; a source without rows gets an
+    empty file, so stale data is overwritten too"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = {"TEXT": pa.string(), "INTEGER": pa.int16(), "DOUBLE": pa.float64()}
+    schema = pa.schema([(n, types[t]) for n, t in COLUMNS])
+    by_source = {source: [] for source in sources or ()}
+    for row in rows:
+        by_source.setdefault(row[0], []).append(row)
+    os.makedirs(store_dir, exist_ok=True)
+    for source, source_rows in by_source.items():
+        columns = list(zip(*source_rows)) or [()] * len(COLUMNS)
+        table = pa.table(
+            [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+            schema=schema,
+        )
+        pq.write_table(table, os.path.join(store_dir, f"{source}.parquet"))
+
+
+def source_of(csv_path, source=None):
+    """Source tag of a CSV: `source` if given, else the file name"""
+    if source is not None:
+        return source
+    return os.path.splitext(os.path.basename(csv_path))[0]
+
+
+def build_store(csv_paths, store_path, source=None, fmt=None):
+    """Load scraper CSVs into a SQLite file or a Parquet directory
+
+    Each CSV replaces its source, even when it has no rows.
+    """
+    rows = []
+    sources = set()
+    for csv_path in csv_paths:
+        sources.add(source_of(csv_path, source))
+        rows.extend(parse_rows(csv_path, source))
+    if is_parquet_store(store_path, fmt):
+        build_parquet(rows, store_path, sources)
+    else:
+        build_sqlite(rows, store_path, sources)
+    return len(rows)
+
+
+# ---------------------------------------------------------------------------
+# Querying
+# ---------------------------------------------------------------------------
+
+class Filters:
+    """Dashboard filters; None means "no filter" """
+
+    def __init__(self, position=None, foot=None, age_range=None, name=None,
+                 source=None):
+        self.position = position
+        self.foot = foot
+        self.age_range = age_range
+        self.name = name
+        self.source = source
+
+    def where(self):
+        """Return (SQL WHERE clause, parameters)"""
+        clauses, params = [], []
+        if self.position is not None:
+            clauses.append("position = ?")
+            params.append(self.position)
+        if self.foot is not None:
+            clauses.append("foot = ?")
+            params.append(self.foot)
+        if self.age_range is not None:
+            clauses.append("age_numeric BETWEEN ? AND ?")
+            params.extend(self.age_range)
+        if self.name:
+            clauses.append("lower(name) LIKE ?")
+            params.append(f"%{self.name.lower()}%")
+        if self.source is not None:
+            clauses.append("source = ?")
+            params.append(self.source)
+        if not clauses:
+            return "", params
+        return " WHERE " + " AND ".join(clauses), params
+
+
+class PlayerStore:
+    """Run filtered, aggregated queries against a player store"""
+
+    def __init__(self, path):
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        self.path = path
+        # One connection shared by the dashboard sessions; queries are serialized
+        self._lock = threading.Lock()
+        if os.path.isdir(path):
+            import duckdb
+
+            # DDL cannot take prepared parameters, so the path goes in as a literal
+            if not any(name.endswith(".parquet") for name in os.listdir(path)):
+                raise FileNotFoundError(f"No .parquet files in store directory {path}")
+            pattern = os.path.join(path, "*.parquet").replace("'", "''")
+            self._con = duckdb.connect()
+            self._con.execute(
+                f"CREATE VIEW {TABLE} AS SELECT * FROM read_parquet('{pattern}')"
+            )
+        else:
+            self._con = sqlite3.connect(path, check_same_thread=False)
+
+    def close(self):
+        self._con.close()
+
+    def _fetch(self, sql, params=()):
+        with self._lock:
+            cursor = self._con.execute(sql, list(params))
+            names = [d[0] for d in cursor.description]
+            rows = cursor.fetchall()
+        return [dict(zip(names, row)) for row in rows]
+
+    def distinct(self, column, filters=None):
+        """Sorted non-null values of a categorical column"""
+        _check(column, GROUP_COLUMNS)
+        where, params = (filters or Filters()).where()
+        clause = f"{where} AND" if where else " WHERE"
+        rows = self._fetch(f"SELECT DISTINCT {column} AS v FROM {TABLE}{clause} "
+                           f"{column} IS NOT NULL ORDER BY v", params)
+        return [row["v"] for row in rows]
+
+    def age_bounds(self, filters=None):
+        """(min age, max age), or None when no age is known"""
+        where, params = (filters or Filters()).where()
+        row = self._fetch(f"SELECT MIN(age_numeric) AS lo, MAX(age_numeric) AS hi "
+                          f"FROM {TABLE}{where}", params)[0]
+        if row["lo"] is None:
+            return None
+        return int(row["lo"]), int(row["hi"])
+
+    def summary(self, filters=None):
+        """Player count, average age, total value and average height"""
+        where, params = (filters or Filters()).where()
+        return self._fetch(
+            "SELECT COUNT(*) AS players, AVG(age_numeric) AS avg_age, "
+            "COALESCE(SUM(market_value_numeric), 0) AS total_value, "
+            f"AVG(height_numeric) AS avg_height FROM {TABLE}{where}", params
+        )[0]
+
+    def group_by(self, column, filters=None, agg="count", value=None):
+        """Aggregate per group, largest first: [{column: ..., "value": ...}]"""
+        _check(column, GROUP_COLUMNS)
+        expr = AGGREGATES[agg]
+        if agg != "count":
+            _check(value, NUMERIC_COLUMNS)
+            expr = expr.format(value)
+        where, params = (filters or Filters()).where()
+        clause = f"{where} AND" if where else " WHERE"
+        return self._fetch(
+            f"SELECT {column}, {expr} AS value FROM {TABLE}{clause} "
+            f"{column} IS NOT NULL GROUP BY {column} ORDER BY value DESC",
+            params,
+        )
+
+    def top_n(self, n, by="market_value_numeric", filters=None, columns=None):
+        """The n players with the largest value in a numeric column"""
+        _check(by, NUMERIC_COLUMNS)
+        where, params = (filters or Filters()).where()
+        clause = f"{where} AND" if where else " WHERE"
+        return self._fetch(
+            f"SELECT {_select(columns)} FROM {TABLE}{clause} {by} IS NOT NULL "
+            f"ORDER BY {by} DESC LIMIT ?", params + [int(n)]
+        )
+
+    def players(self, filters=None, columns=None, limit=None, order_by="name"):
+        """Matching player rows, optionally limited"""
+        _check(order_by, COLUMN_NAMES)
+        where, params = (filters or Filters()).where()
+        sql = f"SELECT {_select(columns)} FROM {TABLE}{where} ORDER BY {order_by}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        return self._fetch(sql, params)
+
+
+def _check(column, allowed):
+    if column not in allowed:
+        raise ValueError(f"Unsupported column {column!r}; expected one of {allowed}")
+
+
+def _select(columns):
+    if columns is None:
+        return ", ".join(COLUMN_NAMES)
+    for column in columns:
+        _check(column, COLUMN_NAMES)
+    return ", ".join(columns)
+
+
+# ---------------------------------------------------------------------------
+# Command line
+# ---------------------------------------------------------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and query the player store")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="load scraper CSVs into a store")
+    build.add_argument("csv", nargs="+")
+    build.add_argument("-o", "--output", default="equipe_maroc.sqlite",
+                       help="store path: .sqlite/.db file, or Parquet directory "
+                            "(existing, ending with '/' or named *.parquet)")
+    build.add_argument("--format", choices=["sqlite", "parquet"], default=None,
+                       help="store format (default: guessed from --output)")
+    build.add_argument("--source", default=None,
+                       help="source tag (default: CSV file name)")
+
+    top = sub.add_parser("top", help="most valuable players")
+    top.add_argument("store")
+    top.add_argument("--n", type=int, default=10)
+    top.add_argument("--position", default=None)
+
+    args = parser.parse_args(argv)
+    if args.command == "build":
+        count = build_store(args.csv, args.output, args.source, args.format)
+        print(f"✓ {count} players loaded into {args.output}")
+    elif args.command == "top":
+        from writers import format_table
+
+        store = PlayerStore(args.store)
+        rows = store.top_n(args.n, filters=Filters(position=args.position),
+                           columns=["name", "position", "age", "market_value"])
+        print(format_table(rows))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
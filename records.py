@@ -0,0 +1,422 @@
+"""Compact record types for scraped players and books.
+
+The scrapers produce one dict of strings per player ("N/A" sentinels,
+"05/04/1991 (32)" age strings, "€11.00m" market values) and four parallel
+lists of strings per book page. This module parses those values once into:
+
+- ``Player`` / ``Book``: ``__slots__`` records holding parsed numbers,
+  interned categorical strings (position, foot, availability) and ``None``
+  instead of "N/A".
+- ``PlayerTable`` / ``BookTable``: column stores backed by ``array.array``.
+  Numeric, date and categorical-code columns are exported to pandas/Arrow as
+  views over the same memory. The free-text columns (name, title, link) and
+  the null masks are built on export.
+
+pandas and pyarrow are only imported by ``to_pandas()`` / ``to_arrow()``.
+"""
+import re
+import sys
+from array import array
+from datetime import date
+
+MISSING = ("", "N/A", "-", "nan")
+
+_AGE_RE = re.compile(r"\((\d+)\)")
+_DMY_RE = re.compile(r"(\d{1,2})[/.](\d{1,2})[/.](\d{4})")
+_NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)?")
+_EPOCH = date(1970, 1, 1).toordinal()
+_NAT = -2 ** 63          # numpy's NaT for datetime64[s]
+_DAY = 86400
+
+
+# ---------------------------------------------------------------------------
+# Parsing helpers (raw scraped string -> typed value or None)
+# ---------------------------------------------------------------------------
+
+def _is_missing(text):
+    return text is None or str(text).strip() in MISSING
+
+
+def parse_category(text):
+    """Strip and intern a categorical string ("Goalkeeper", "right", ...)"""
+    if _is_missing(text):
+        return None
+    return sys.intern(str(text).strip())
+
+
+def parse_age(text):
+    """Parse "05/04/1991 (32)" into (date(1991, 4, 5), 32)
+
+    Either part is None when it cannot be read; a bare "32" gives (None, 32).
+    """
+    if _is_missing(text):
+        return None, None
+    text = str(text)
+    birth_date = None
+    match = _DMY_RE.search(text)
+    if match:
+        day, month, year = (int(g) for g in match.groups())
+        try:
+            birth_date = date(year, month, day)
+        except ValueError:
+            birth_date = None
+    match = _AGE_RE.search(text)
+    if match:
+        return birth_date, int(match.group(1))
+    if text.strip().isdigit():
+        return birth_date, int(text.strip())
+    return birth_date, None
+
+
+def _parse_number(text):
+    match = _NUMBER_RE.search(text)
+    if not match:
+        return None
+    return float(match.group(0).replace(",", "."))
+
+
+def parse_market_value(text):
+    """Parse "€11.00m", "€500k", "11,00 mio. €" or "€1.20bn" into euros"""
+    if _is_missing(text):
+        return None
+    text = str(text).lower()
+    number = _parse_number(text)
+    if number is None:
+        return None
+    if "bn" in text or "mrd" in text:
+        return number * 1_000_000_000
+    if "m" in text:
+        return number * 1_000_000
+    if "k" in text or "th" in text:
+        return number * 1_000
+    return number
+
+
+def parse_height(text):
+    """Parse "1,85 m" or "185 cm" into metres"""
+    if _is_missing(text):
+        return None
+    text = str(text).lower()
+    number = _parse_number(text)
+    if number is None:
+        return None
+    if "cm" in text or number > 3:
+        return number / 100
+    return number
+
+
+def parse_price(text):
+    """Parse "€51.77" (or "£51.77") into a float"""
+    if _is_missing(text):
+        return None
+    return _parse_number(str(text))
+
+
+# ---------------------------------------------------------------------------
+# Row records
+# ---------------------------------------------------------------------------
+
+class _Record:
+    __slots__ = ()
+
+    def __init__(self, *args, **kwargs):
+        values = dict(zip(self.__slots__, args))
+        values.update(kwargs)
+        for field in self.__slots__:
+            setattr(self, field, values.get(field))
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.as_dict() == other.as_dict()
+
+    def __repr__(self):
+        fields = ", ".join(f"{k}={v!r}" for k, v in self.as_dict().items())
+        return f"{type(self).__name__}({fields})"
+
+
+class Player(_Record):
+    """One player of a squad, with parsed values"""
+    __slots__ = ("name", "birth_date", "age", "position", "height",
+                 "foot", "market_value")
+
+    @classmethod
+    def from_raw(cls, row):
+        """Build a Player from a scraped row dict of strings"""
+        birth_date, age = parse_age(row.get("age"))
+        return cls(
+            name=None if _is_missing(row.get("name")) else str(row["name"]).strip(),
+            birth_date=birth_date,
+            age=age,
+            position=parse_category(row.get("position")),
+            height=parse_height(row.get("height")),
+            foot=parse_category(row.get("foot")),
+            market_value=parse_market_value(row.get("market_value")),
+        )
+
+
+class Book(_Record):
+    """One book from the books.toscrape.com catalogue"""
+    __slots__ = ("title", "price", "availability", "link")
+
+    @classmethod
+    def from_raw(cls, title, price, availability, link):
+        """Build a Book from the strings returned by the notebook helpers"""
+        return cls(
+            title=None if _is_missing(title) else str(title).strip(),
+            price=parse_price(price),
+            availability=parse_category(availability),
+            link=None if _is_missing(link) else str(link).strip(),
+        )
+
+
+# ---------------------------------------------------------------------------
+# Column stores
+# ---------------------------------------------------------------------------
+# Column kinds:
+#   "str"      -> list of str (None allowed)
+#   "float"    -> array('d'), NaN for missing
+#   "int"      -> array('h') + bytearray validity (1 = present)
+#   "date"     -> array('q') of seconds since 1970-01-01, NaT for missing
+#                 (the memory layout of numpy datetime64[s])
+#   "category" -> array('b') of codes into a per-column list, -1 for missing;
+#                 widened to array('h') from 127 categories on, which is the
+#                 code width pandas uses, so Categorical can share the buffer
+
+_NAN = float("nan")
+
+
+class _Table:
+    record_type = None
+    columns = ()
+
+    def __init__(self, records=()):
+        self._data = {}
+        self._valid = {}
+        self._categories = {}
+        self._codes = {}
+        for name, kind in self.columns:
+            if kind == "str":
+                self._data[name] = []
+            elif kind == "float":
+                self._data[name] = array("d")
+            elif kind == "int":
+                self._data[name] = array("h")
+                self._valid[name] = bytearray()
+            elif kind == "date":
+                self._data[name] = array("q")
+            elif kind == "category":
+                self._data[name] = array("b")
+                self._categories[name] = []
+                self._codes[name] = {}
+        self._length = 0
+        self.extend(records)
+
+    def __len__(self):
+        return self._length
+
+    def append(self, record):
+        """Append a record
+
+        If a value cannot be stored (wrong type, age out of the int16 range,
+        or BufferError while views returned by to_pandas()/to_arrow() are
+        still alive), the table is left unchanged and the error re-raised.
+        """
+        categories = {name: len(values) for name, values in self._categories.items()}
+        try:
+            for name, kind in self.columns:
+                self._append_value(name, kind, getattr(record, name))
+        except BaseException:
+            self._rollback(categories)
+            raise
+        self._length += 1
+
+    def _rollback(self, categories):
+        # Columns are cut back to the table length; exported ones were not
+        # grown (resizing them is what raised), and must not be touched
+        for column in list(self._data.values()) + list(self._valid.values()):
+            if len(column) > self._length:
+                del column[self._length:]
+        for name, count in categories.items():
+            for value in self._categories[name][count:]:
+                del self._codes[name][value]
+            del self._categories[name][count:]
+
+    def _append_value(self, name, kind, value):
+        column = self._data[name]
+        if kind == "str":
+            column.append(value)
+        elif kind == "float":
+            column.append(_NAN if value is None else value)
+        elif kind == "date":
+            column.append(_NAT if value is None else (value.toordinal() - _EPOCH) * _DAY)
+        elif kind == "int":
+            column.append(0 if value is None else value)
+            self._valid[name].append(value is not None)
+        elif kind == "category":
+            if value is None:
+                column.append(-1)
+                return
+            codes = self._codes[name]
+            code = codes.get(value)
+            if code is None:
+                code = len(self._categories[name])
+                if code == 126 and column.typecode == "b":
+                    column = self._data[name] = array("h", column)
+                codes[value] = code
+                self._categories[name].append(value)
+            column.append(code)
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+
+    def _value(self, name, kind, i):
+        value = self._data[name][i]
+        if kind == "float":
+            return None if value != value else value
+        if kind == "int":
+            return value if self._valid[name][i] else None
+        if kind == "date":
+            return None if value == _NAT else date.fromordinal(value // _DAY + _EPOCH)
+        if kind == "category":
+            return None if value < 0 else self._categories[name][value]
+        return value
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self._length
+        if not 0 <= i < self._length:
+            raise IndexError("record index out of range")
+        return self.record_type(**{
+            name: self._value(name, kind, i) for name, kind in self.columns
+        })
+
+    def __iter__(self):
+        for i in range(self._length):
+            yield self[i]
+
+    def nbytes(self):
+        """Approximate memory held by the numeric and categorical buffers"""
+        total = 0
+        for name, kind in self.columns:
+            if kind != "str":
+                column = self._data[name]
+                total += column.itemsize * len(column)
+        return total + sum(len(v) for v in self._valid.values())
+
+    def to_arrow(self):
+        """Return a pyarrow.Table
+
+        The float, int, date (as timestamp[s]) and dictionary-code columns
+        reuse the table's buffers; validity bitmaps and the string columns
+        are built on each call.
+        """
+        import numpy as np
+        import pyarrow as pa
+
+        arrays = []
+        for name, kind in self.columns:
+            column = self._data[name]
+            if kind == "str":
+                arrays.append(pa.array(column, type=pa.string()))
+                continue
+            values = np.frombuffer(column, dtype=column.typecode)
+            if kind == "float":
+                arrays.append(pa.array(values, from_pandas=True))
+            elif kind == "int":
+                mask = np.frombuffer(self._valid[name], dtype=np.bool_)
+                arrays.append(pa.array(values, mask=~mask))
+            elif kind == "date":
+                arrays.append(pa.array(values.view("datetime64[s]"), from_pandas=True))
+            elif kind == "category":
+                arrays.append(pa.DictionaryArray.from_arrays(
+                    pa.array(values, mask=values < 0),
+                    pa.array(self._categories[name], type=pa.string()),
+                ))
+        return pa.Table.from_arrays(arrays, names=[n for n, _ in self.columns])
+
+    def to_pandas(self):
+        """Return a pandas.DataFrame
+
+        The float, int, datetime64 and category-code columns are views over
+        the table's buffers; the int masks and the string columns are built
+        on each call.
+        """
+        import numpy as np
+        import pandas as pd
+
+        data = {}
+        for name, kind in self.columns:
+            column = self._data[name]
+            if kind == "str":
+                data[name] = pd.array(column, dtype="string")
+                continue
+            values = np.frombuffer(column, dtype=column.typecode)
+            if kind == "float":
+                data[name] = values
+            elif kind == "int":
+                mask = np.frombuffer(self._valid[name], dtype=np.bool_)
+                data[name] = pd.arrays.IntegerArray(values, ~mask)
+            elif kind == "date":
+                data[name] = values.view("datetime64[s]")
+            elif kind == "category":
+                data[name] = pd.Categorical.from_codes(
+                    values, categories=self._categories[name], validate=False
+                )
+        return pd.DataFrame(data, copy=False)
+
+
+class PlayerTable(_Table):
+    """Array-backed collection of Player records"""
+    record_type = Player
+    columns = (
+        ("name", "str"),
+        ("birth_date", "date"),
+        ("age", "int"),
+        ("position", "category"),
+        ("height", "float"),
+        ("foot", "category"),
+        ("market_value", "float"),
+    )
+
+    @classmethod
+    def from_csv(cls, path):
+        """Load a scraper CSV (equipe_maroc.csv) into a PlayerTable"""
+        import csv
+
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            return cls(Player.from_raw(row) for row in csv.DictReader(f))
+
+
+class BookTable(_Table):
+    """Array-backed collection of Book records"""
+    record_type = Book
+    columns = (
+        ("title", "str"),
+        ("price", "float"),
+        ("availability", "category"),
+        ("link", "str"),
+    )
+
+    @classmethod
+    def from_lists(cls, titles, prices, availability, links):
+        """Build a BookTable from the four parallel lists of the notebooks"""
+        return cls(
+            Book.from_raw(*values)
+            for values in zip(titles, prices, availability, links)
+        )
+
+    @classmethod
+    def from_csv(cls, path):
+        """Load a books CSV (Scraping.csv) into a BookTable"""
+        import csv
+
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            return cls(
+                Book.from_raw(row["Title"], row["Price"], row["avalaible"], row["Link"])
+                for row in csv.DictReader(f)
+            )
@@ -0,0 +1,25 @@
+import os
+import sys
+
+import pytest
+
+# The scripts live at the repository root, not in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from local_site import LocalSite  # noqa: E402
+
+
+@pytest.fixture
+def local_site():
+    """Start LocalSite(**kwargs) servers, stopped after the test"""
+    pytest.importorskip("requests")
+    pytest.importorskip("bs4")
+    sites = []
+
+    def start(**kwargs):
+        site = LocalSite(**kwargs).start()
+        sites.append(site)
+        return site
+
+    yield start
+    for site in sites:
+        site.stop()
@@ -0,0 +1,135 @@
+"""Local Transfermarkt-like site for the tests
+
+A squad page listing ``players`` profiles (/squad, /p/<i>). ``pages``
+overrides or adds paths: a body string, an HTTP status, or a function of
+the hit count for that path returning either. With ``capacity`` set it
+also throttles like a busy server: latency grows with the requests in
+flight, and past ``capacity`` profiles get a blank page, past
+``capacity + 1`` a 429 with ``Retry-After``.
+
+Runnable on its own to try the scraper:
+
+    python tests/local_site.py --port 8766
+    python cli.py --details --url http://127.0.0.1:8766/squad -o /tmp/players.csv
+"""
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def squad_page(players):
+    return '<table class="items">' + "".join(
+        f'<tr class="odd"><td class="zentriert">{i}<table><tr><td>Goalkeeper</td>'
+        f'</tr></table></td><td class="zentriert">05/04/1991 (32)</td>'
+        f'<td class="hauptlink"><a href="/p/{i}">Player {i}</a></td>'
+        f'<td class="rechts hauptlink">€{i}.00m</td></tr>'
+        for i in players
+    ) + "</table>"
+
+
+def profile_page(i, height="1,85 m", foot="right"):
+    return (f'<h1>Player {i}</h1>'
+            f'<span class="info-table__content">{height}</span>'
+            f'<span class="info-table__content">{foot}</span>')
+
+
+class LocalSite:
+    def __init__(self, players=20, pages=None, capacity=None, base_latency=0.0,
+                 retry_after=1, port=0):
+        self.players = players
+        self.pages = dict(pages or {})
+        self.capacity = capacity
+        self.base_latency = base_latency
+        self.retry_after = retry_after
+        self.hits = {}
+        self.times = []
+        self.stats = {"ok": 0, "blank": 0, "429": 0}
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+
+    def serve_forever(self):
+        self._httpd.serve_forever()
+
+    def start(self):
+        """Serve from a background thread"""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def respond(self, path):
+        """(status, headers, body) for one request, counting it as in flight"""
+        with self._lock:
+            self.times.append(time.time())
+            hit = self.hits[path] = self.hits.get(path, 0) + 1
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            active = self.active
+        try:
+            time.sleep(self.base_latency * active)
+            return self._page(path, hit, active)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def _page(self, path, hit, active):
+        if path in self.pages:
+            page = self.pages[path]
+            if callable(page):
+                page = page(hit)
+            if isinstance(page, int):
+                return page, {}, ""
+            return 200, {}, page
+        if path == "/squad":
+            return 200, {}, squad_page(range(self.players))
+        if not path.startswith("/p/"):
+            return 404, {}, ""
+        if self.capacity is not None:
+            with self._lock:
+                if active > self.capacity + 1:
+                    self.stats["429"] += 1
+                    return 429, {"Retry-After": str(self.retry_after)}, ""
+                if active > self.capacity:
+                    self.stats["blank"] += 1
+                    return 200, {}, "<html></html>"
+        with self._lock:
+            self.stats["ok"] += 1
+        return 200, {}, profile_page(path[3:])
+
+    def _handler(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                status, headers, body = site.respond(self.path)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body.encode())
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--players", type=int, default=40)
+    parser.add_argument("--capacity", type=int, default=3)
+    args = parser.parse_args()
+    site = LocalSite(args.players, capacity=args.capacity, base_latency=0.1,
+                     port=args.port)
+    print(f"Serving {site.url}/squad")
+    try:
+        site.serve_forever()
+    except KeyboardInterrupt:
+        print(site.stats, "peak", site.peak)
@@ -0,0 +1,361 @@
+import socket
+import threading
+import time
+
+import pytest
+
+import crawl
+from crawl import (DONE, FAILED, LEASED, MAX_ATTEMPTS, PENDING, MemoryQueue,
+                   RateLimitedFetcher, SQLiteQueue)
+from local_site import profile_page, squad_page
+from throttle import AIMDController, Throttled
+
+
+@pytest.fixture(params=["memory", "sqlite", "http"])
+def queue(request, tmp_path):
+    if request.param == "memory":
+        yield MemoryQueue()
+    elif request.param == "sqlite":
+        queue = SQLiteQueue(str(tmp_path / "crawl.sqlite"))
+        yield queue
+        queue.close()
+    else:
+        httpd = crawl.queue_server(MemoryQueue(), port=0)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        yield crawl.HTTPQueue(f"http://127.0.0.1:{httpd.server_address[1]}")
+        httpd.shutdown()
+        httpd.server_close()
+
+
+# ---------------------------------------------------------------------------
+# Backend contract: MemoryQueue, SQLiteQueue and HTTPQueue behave the same
+# ---------------------------------------------------------------------------
+
+def test_put_ignores_duplicates(queue):
+    assert queue.put("profile", "http://x/p/1", {"name": "A"})
+    assert not queue.put("profile", "http://x/p/1")
+    assert queue.put("squad", "http://x/p/1")
+    assert queue.counts()[PENDING] == 2
+
+
+def test_put_refresh_requeues_finished_tasks(queue):
+    queue.put("squad", "http://x/squad", {"season": 2023})
+    task = queue.lease("w1")
+    assert not queue.put("squad", "http://x/squad", refresh=time.time() - 60)
+    assert not queue.put("squad", "http://x/squad", refresh=time.time())  # still leased
+    queue.complete(task, [{"name": "old"}])
+    assert not queue.put("squad", "http://x/squad")
+    assert not queue.put("squad", "http://x/squad", refresh=time.time() - 60)
+
+    assert queue.put("squad", "http://x/squad", {"season": 2024}, refresh=time.time())
+    assert queue.counts()[PENDING] == 1
+    task = queue.lease("w1")
+    assert (task.payload, task.attempts) == ({"season": 2024}, 1)
+    queue.complete(task, [{"name": "new"}])
+    assert queue.results("squad") == [{"name": "new"}]
+
+
+def test_lease_and_complete(queue):
+    queue.put("profile", "http://x/p/1", {"name": "A"})
+    queue.put("profile", "http://x/p/2")
+    task = queue.lease("w1")
+    assert (task.url, task.payload, task.attempts) == ("http://x/p/1", {"name": "A"}, 1)
+    assert queue.lease("w2").url == "http://x/p/2"
+    assert queue.lease("w3") is None
+
+    queue.complete(task, [{"name": "A"}])
+    assert queue.counts() == {PENDING: 0, LEASED: 1, DONE: 1, FAILED: 0}
+    assert queue.results("profile") == [{"name": "A"}]
+
+
+def test_expired_lease_is_taken_over_and_stale_complete_ignored(queue):
+    queue.put("profile", "http://x/p/1")
+    stale = queue.lease("dead", lease_seconds=0.05)
+    assert queue.lease("w2") is None
+    time.sleep(0.1)
+
+    task = queue.lease("w2")
+    assert (task.id, task.attempts) == (stale.id, 2)
+    queue.complete(stale, [{"name": "stale"}])
+    queue.fail(stale, "stale")
+    assert queue.counts()[LEASED] == 1
+
+    queue.complete(task, [{"name": "fresh"}])
+    queue.complete(task, [{"name": "again"}])
+    assert queue.results("profile") == [{"name": "fresh"}]
+
+
+def test_fail_retries_until_max_attempts(queue):
+    queue.put("profile", "http://x/p/1")
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        task = queue.lease("w1")
+        assert task.attempts == attempt
+        queue.fail(task, ValueError(f"boom {attempt}"))
+    assert queue.lease("w1") is None
+    assert queue.counts()[FAILED] == 1
+    [(task, error)] = queue.errors()
+    assert (task.url, error) == ("http://x/p/1", f"boom {MAX_ATTEMPTS}")
+
+
+def test_expired_last_lease_fails(queue):
+    queue.put("profile", "http://x/p/1")
+    for _ in range(MAX_ATTEMPTS - 1):
+        queue.fail(queue.lease("w1"), "boom")
+    queue.lease("dead", lease_seconds=0.05)
+    time.sleep(0.1)
+    assert queue.lease("w2") is None
+    assert queue.errors()[0][1] == "lease expired"
+
+
+def test_reserve_slot_spaces_requests_per_host(queue):
+    waits = [queue.reserve_slot("a.example", 0.5) for _ in range(3)]
+    assert waits[0] == pytest.approx(0.0, abs=0.01)
+    assert waits[1] == pytest.approx(0.5, abs=0.05)
+    assert waits[2] == pytest.approx(1.0, abs=0.05)
+    assert queue.reserve_slot("b.example", 0.5) == pytest.approx(0.0, abs=0.01)
+
+
+def test_run_worker_retries_failed_tasks(queue):
+    calls = {}
+
+    def flaky(task, fetch, queue):
+        calls[task.url] = calls.get(task.url, 0) + 1
+        if task.url.endswith("bad") or calls[task.url] == 1:
+            raise ValueError("flaky")
+        return [{"url": task.url}]
+
+    queue.put("profile", "http://x/good")
+    queue.put("profile", "http://x/bad")
+    completed = crawl.run_worker(queue, "w1", fetch=lambda url: None,
+                                 handlers={"profile": flaky}, poll=0.01, log=lambda msg: None)
+    assert completed == 1
+    assert calls == {"http://x/good": 2, "http://x/bad": MAX_ATTEMPTS}
+    assert queue.results("profile") == [{"url": "http://x/good"}]
+    assert queue.counts()[FAILED] == 1
+
+
+def test_shared_player_fetched_once_and_exported_per_squad(queue):
+    bs4 = pytest.importorskip("bs4")
+    pages = {
+        "http://x/squad/2023": squad_page([1, 2]),
+        "http://x/squad/2024": squad_page([2, 3]),
+        "http://x/p/1": '<span class="info-table__content">1,81 m</span>',
+        "http://x/p/2": '<span class="info-table__content">1,82 m</span>',
+        "http://x/p/3": '<span class="info-table__content">1,83 m</span>',
+    }
+    fetched = []
+
+    def fetch(url, is_empty=None):
+        fetched.append(url)
+        return bs4.BeautifulSoup(pages[url], "html.parser")
+
+    def crawl_all():
+        crawl.run_worker(queue, "w1", fetch=fetch, poll=0.01, log=lambda msg: None)
+
+    queue.put("squad", "http://x/squad/2023")
+    queue.put("squad", "http://x/squad/2024")
+    crawl_all()
+    assert sorted(fetched).count("http://x/p/2") == 1
+    players = crawl.export_players(queue)
+    assert [(p["name"], p["height"], p["squad"]) for p in players] == [
+        ("Player 1", "1,81 m", "http://x/squad/2023"),
+        ("Player 2", "1,82 m", "http://x/squad/2023"),
+        ("Player 2", "1,82 m", "http://x/squad/2024"),
+        ("Player 3", "1,83 m", "http://x/squad/2024"),
+    ]
+
+    # A refresh of one squad fetches it and its profiles again
+    fetched.clear()
+    pages["http://x/p/2"] = '<span class="info-table__content">1,92 m</span>'
+    refresh = time.time()
+    assert queue.put("squad", "http://x/squad/2024", {"refresh": refresh}, refresh)
+    crawl_all()
+    assert sorted(fetched) == ["http://x/p/2", "http://x/p/3", "http://x/squad/2024"]
+    assert [p["height"] for p in crawl.export_players(queue)] == [
+        "1,81 m", "1,92 m", "1,92 m", "1,83 m"]
+
+
+def test_profile_still_empty_is_parsed_on_last_attempt(queue):
+    bs4 = pytest.importorskip("bs4")
+    pages = {
+        "http://x/squad": squad_page([1]),
+        # No header and no info-table: looks throttled on every attempt
+        "http://x/p/1": "<div><span>1,90 m</span></div>",
+    }
+    fetch = RateLimitedFetcher(
+        queue, 0.0, get=lambda url: bs4.BeautifulSoup(pages[url], "html.parser"),
+        controller=AIMDController(backoff_delay=0.01, max_delay=0.05),
+    )
+    queue.put("squad", "http://x/squad")
+    crawl.run_worker(queue, "w1", fetch=fetch, poll=0.01, log=lambda msg: None)
+    assert queue.counts()[DONE] == 2
+    assert fetch.controller.stats["empty"] == MAX_ATTEMPTS
+    [player] = crawl.export_players(queue)
+    assert (player["name"], player["height"], player["foot"]) == ("Player 1", "1,90 m", "N/A")
+
+
+class RecordingQueue(MemoryQueue):
+    def __init__(self, events):
+        super().__init__()
+        self.events = events
+
+    def reserve_slot(self, host, interval):
+        self.events.append("reserve")
+        return super().reserve_slot(host, interval)
+
+
+class RecordingController(AIMDController):
+    def __init__(self, events):
+        super().__init__(backoff_delay=0.01)
+        self.events = events
+
+    def acquire(self):
+        self.events.append("acquire")
+        super().acquire()
+
+
+def test_fetcher_takes_controller_slot_before_host_slot():
+    events = []
+
+    def get(url):
+        events.append("get")
+        return "page"
+
+    fetch = RateLimitedFetcher(RecordingQueue(events), 0.2, get=get,
+                               controller=RecordingController(events))
+    assert fetch("http://x/p/1") == "page"
+    assert fetch("http://x/p/2") == "page"
+    assert events == ["acquire", "reserve", "get"] * 2
+    # The wait for the host slot is not counted as latency
+    assert fetch.controller.latency < 0.1
+
+
+def test_fetcher_empty_page_backs_off_and_retries_task():
+    queue = MemoryQueue()
+    controller = AIMDController(backoff_delay=0.01)
+    fetch = RateLimitedFetcher(queue, 0.0, get=lambda url: "<html></html>",
+                               controller=controller)
+    with pytest.raises(Throttled):
+        fetch("http://x/p/1", lambda page: True)
+    assert controller.stats["empty"] == 1
+
+    pages = iter(["blank", "full"])
+    fetch = RateLimitedFetcher(queue, 0.0, get=lambda url: next(pages),
+                               controller=controller)
+    queue.put("profile", "http://x/p/1")
+    handlers = {"profile": lambda task, fetch, queue:
+                [{"page": fetch(task.url, lambda page: page == "blank")}]}
+    crawl.run_worker(queue, "w1", fetch=fetch, handlers=handlers, poll=0.01,
+                     log=lambda msg: None)
+    assert queue.results("profile") == [{"page": "full"}]
+    assert controller.stats["empty"] == 2
+
+
+# ---------------------------------------------------------------------------
+# End to end: worker processes against a flaky local server
+# ---------------------------------------------------------------------------
+
+PLAYERS = 8
+ALWAYS_FAILS = 7
+
+
+def flaky_profile(i):
+    """Profile i for the end-to-end site: profile ALWAYS_FAILS always
+    answers 500 and every third one answers 503 the first time"""
+    if i == ALWAYS_FAILS:
+        return 500
+    if i % 3 == 0:
+        return lambda hit: 503 if hit == 1 else profile_page(i)
+    return profile_page(i)
+
+
+@pytest.fixture
+def site(local_site):
+    return local_site(players=PLAYERS,
+                      pages={f"/p/{i}": flaky_profile(i) for i in range(PLAYERS)})
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def serve_queue(db):
+    """`crawl.py serve` in a separate process; returns (process, URL)"""
+    import multiprocessing
+
+    port = free_port()
+    process = multiprocessing.Process(
+        target=crawl.main, args=(["--db", db, "serve", "--port", str(port)],))
+    process.start()
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            crawl.HTTPQueue(url, timeout=1)
+            return process, url
+        except OSError:
+            time.sleep(0.05)
+    process.terminate()
+    raise RuntimeError("queue server did not start")
+
+
+@pytest.mark.parametrize("workers, via_http", [
+    (["--processes", "4"], False),
+    (["--processes", "2", "--threads", "2", "--adaptive"], False),
+    (["--processes", "2", "--threads", "2"], True),
+])
+def test_worker_processes(site, tmp_path, workers, via_http):
+    db = str(tmp_path / "crawl.sqlite")
+    interval = 0.2
+    assert crawl.main(["--db", db, "enqueue", "--squad", site.url + "/squad"]) == 0
+
+    # A worker that leases the squad page and dies: the task must be re-leased
+    queue = SQLiteQueue(db)
+    stale = queue.lease("dead", lease_seconds=0.5)
+    queue.close()
+
+    if via_http:
+        # Workers on "other machines" only see the queue through crawl.py serve
+        process, url = serve_queue(db)
+        try:
+            assert crawl.main(["--queue", url, "worker", *workers,
+                               "--interval", str(interval)]) == 0
+            assert crawl.main(["--queue", url, "status"]) == 0
+        finally:
+            process.terminate()
+            process.join()
+    else:
+        assert crawl.main(["--db", db, "worker", *workers, "--interval", str(interval)]) == 0
+
+    queue = SQLiteQueue(db)
+    queue.complete(stale, [{"name": "stale"}])
+    assert queue.counts() == {PENDING: 0, LEASED: 0, DONE: PLAYERS, FAILED: 1}
+
+    # Lease retry: the abandoned squad task and the 503 profiles went through
+    attempts = dict(queue._con.execute("SELECT url, attempts FROM tasks"))
+    assert attempts[site.url + "/squad"] == 2
+    for i in range(PLAYERS):
+        expected = MAX_ATTEMPTS if i == ALWAYS_FAILS else 2 if i % 3 == 0 else 1
+        assert attempts[f"{site.url}/p/{i}"] == expected
+        assert site.hits[f"/p/{i}"] == expected
+
+    # Failure after MAX_ATTEMPTS
+    [(task, error)] = queue.errors()
+    assert task.url == f"{site.url}/p/{ALWAYS_FAILS}"
+    assert "500" in error
+
+    # Complete-once: one row per player, nothing from the stale lease; the
+    # player whose profile failed keeps the squad page fields
+    players = crawl.export_players(queue)
+    assert [p["name"] for p in players] == [f"Player {i}" for i in range(PLAYERS)]
+    assert len(queue.results("profile")) == PLAYERS - 1
+    failed = players[ALWAYS_FAILS]
+    assert (failed["market_value"], failed["height"]) == (f"€{ALWAYS_FAILS}.00m", "N/A")
+    queue.close()
+
+    # The per-host interval holds across the 4 processes
+    times = sorted(site.times)
+    assert len(times) == 1 + sum(site.hits[f"/p/{i}"] for i in range(PLAYERS))
+    gaps = [b - a for a, b in zip(times, times[1:])]
+    assert min(gaps) >= interval - 0.05
@@ -0,0 +1,128 @@
+import csv
+
+import pytest
+
+import query
+from query import Filters, PlayerStore, build_store
+
+FIELDS = ["name", "age", "position", "height", "foot", "market_value"]
+
+TEAM_A = [
+    ["Yassine Bounou", "05/04/1991 (32)", "Goalkeeper", "1,95 m", "left", "€11.00m"],
+    ["Achraf Hakimi", "04/11/1998 (25)", "Right-Back", "1,81 m", "right", "€60.00m"],
+    ["Noussair Mazraoui", "14/11/1997 (26)", "Right-Back", "1,83 m", "right", "€30.00m"],
+]
+TEAM_B = [
+    ["Munir El Kajoui", "10/05/1989 (34)", "Goalkeeper", "1,87 m", "right", "€900k"],
+    ["Ilias Chair", "30/10/1997 (26)", "Attacking Midfield", "N/A", "N/A", "-"],
+]
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(FIELDS)
+        writer.writerows(rows)
+    return str(path)
+
+
+@pytest.fixture
+def csvs(tmp_path):
+    return [write_csv(tmp_path / "team_a.csv", TEAM_A),
+            write_csv(tmp_path / "team_b.csv", TEAM_B)]
+
+
+def parquet_available():
+    try:
+        import duckdb  # noqa: F401
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+@pytest.fixture(params=["sqlite", "parquet"])
+def store(request, csvs, tmp_path):
+    if request.param == "parquet":
+        if not parquet_available():
+            pytest.skip("duckdb/pyarrow not installed")
+        path = str(tmp_path / "store") + "/"
+    else:
+        path = str(tmp_path / "store.sqlite")
+    build_store(csvs, path)
+    store = PlayerStore(path)
+    yield store
+    store.close()
+
+
+def test_summary(store):
+    summary = store.summary()
+    assert summary["players"] == 5
+    assert summary["total_value"] == pytest.approx(101_900_000)
+    assert summary["avg_age"] == pytest.approx((32 + 25 + 26 + 34 + 26) / 5)
+
+    filtered = store.summary(Filters(position="Right-Back", age_range=(20, 25)))
+    assert filtered["players"] == 1
+
+
+def test_group_by(store):
+    counts = {r["position"]: r["value"] for r in store.group_by("position")}
+    assert counts == {"Goalkeeper": 2, "Right-Back": 2, "Attacking Midfield": 1}
+
+    totals = store.group_by("source", agg="sum", value="market_value_numeric")
+    assert [r["source"] for r in totals] == ["team_a", "team_b"]
+    assert totals[0]["value"] == pytest.approx(101_000_000)
+
+
+def test_top_n_and_search(store):
+    top = store.top_n(2, columns=["name", "market_value"])
+    assert [r["name"] for r in top] == ["Achraf Hakimi", "Noussair Mazraoui"]
+
+    rows = store.players(Filters(name="EL KA"), columns=["name"])
+    assert rows == [{"name": "Munir El Kajoui"}]
+    assert len(store.players(limit=2)) == 2
+    assert store.distinct("foot") == ["left", "right"]
+
+
+def test_options_per_source(store):
+    team_b = Filters(source="team_b")
+    assert store.distinct("source") == ["team_a", "team_b"]
+    assert store.distinct("position", team_b) == ["Attacking Midfield", "Goalkeeper"]
+    assert store.age_bounds(team_b) == (26, 34)
+
+
+def test_reloading_a_source_replaces_it(store, csvs):
+    write_csv(csvs[1], TEAM_B[:1])
+    build_store([csvs[1]], store.path)
+    assert store.summary()["players"] == 4
+
+
+def test_reloading_an_empty_csv_clears_its_source(store, csvs):
+    write_csv(csvs[1], [])
+    assert build_store([csvs[1]], store.path) == 0
+    assert store.summary()["players"] == 3
+    assert store.distinct("source") == ["team_a"]
+
+
+def test_empty_parquet_directory(tmp_path):
+    (tmp_path / "store").mkdir()
+    with pytest.raises(FileNotFoundError, match="No .parquet files"):
+        PlayerStore(str(tmp_path / "store"))
+
+
+def test_store_kind_from_path_or_format(csvs, tmp_path):
+    assert query.is_parquet_store(str(tmp_path / "new") + "/")
+    assert query.is_parquet_store(str(tmp_path / "x.parquet"))
+    assert query.is_parquet_store(str(tmp_path / "new"), fmt="parquet")
+    assert not query.is_parquet_store(str(tmp_path / "new"))
+    assert not query.is_parquet_store(str(tmp_path), fmt="sqlite")
+
+
+def test_cli_builds_parquet_directory(csvs, tmp_path, capsys):
+    if not parquet_available():
+        pytest.skip("duckdb/pyarrow not installed")
+    store_dir = tmp_path / "pq"
+    assert query.main(["build", *csvs, "-o", str(store_dir), "--format", "parquet"]) == 0
+    assert sorted(p.name for p in store_dir.iterdir()) == ["team_a.parquet", "team_b.parquet"]
+    assert query.main(["top", str(store_dir), "--n", "1"]) == 0
+    assert "Achraf Hakimi" in capsys.readouterr().out
@@ -0,0 +1,181 @@
+import csv
+import tracemalloc
+from datetime import date
+
+import pytest
+
+from records import (Book, BookTable, Player, PlayerTable, parse_age,
+                     parse_category, parse_height, parse_market_value, parse_price)
+
+FIELDS = ["name", "age", "position", "height", "foot", "market_value"]
+POSITIONS = ["Goalkeeper", "Centre-Back", "Left Winger", "Centre-Forward"]
+
+
+def raw_row(i):
+    return {
+        "name": f"Player {i}",
+        "age": f"{i % 28 + 1:02d}/04/{1985 + i % 20} ({20 + i % 15})",
+        "position": POSITIONS[i % len(POSITIONS)],
+        "height": f"1,{70 + i % 25} m",
+        "foot": ["right", "left", "N/A"][i % 3],
+        "market_value": f"€{i % 50}.{i % 10}0m",
+    }
+
+
+def write_csv(path, n):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(raw_row(i) for i in range(n))
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("05/04/1991 (32)", (date(1991, 4, 5), 32)),
+    ("5 avr. 1991 (32)", (None, 32)),
+    ("27", (None, 27)),
+    ("N/A", (None, None)),
+    ("31/02/1991 (32)", (None, 32)),
+])
+def test_parse_age(text, expected):
+    assert parse_age(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("€11.00m", 11_000_000),
+    ("11,00 mio. €", 11_000_000),
+    ("€500k", 500_000),
+    ("€1.20bn", 1_200_000_000),
+    ("-", None),
+    ("N/A", None),
+])
+def test_parse_market_value(text, expected):
+    if expected is None:
+        assert parse_market_value(text) is None
+    else:
+        assert parse_market_value(text) == pytest.approx(expected)
+
+
+def test_parse_height_price_category():
+    assert parse_height("1,85 m") == pytest.approx(1.85)
+    assert parse_height("185 cm") == pytest.approx(1.85)
+    assert parse_height("") is None
+    assert parse_price("€51.77") == pytest.approx(51.77)
+    assert parse_category(" right ") == "right"
+    assert parse_category("N/A") is None
+    assert parse_category("Centre" + "-Back") is parse_category("Centre-Back")
+
+
+def test_player_table_round_trip():
+    players = [Player.from_raw(raw_row(i)) for i in range(300)]
+    players.append(Player(name="Nobody"))
+    table = PlayerTable(players)
+    assert len(table) == len(players)
+    assert list(table) == players
+    assert table[-1] == Player(name="Nobody")
+
+
+def test_category_codes_widen_past_int8():
+    table = PlayerTable(Player(name=str(i), position=f"pos{i}") for i in range(200))
+    assert [p.position for p in table] == [f"pos{i}" for i in range(200)]
+
+
+@pytest.mark.parametrize("count", [126, 127, 128])
+def test_category_codes_match_pandas_width(count):
+    np = pytest.importorskip("numpy")
+    pytest.importorskip("pandas")
+    table = PlayerTable(Player(name=str(i), position=f"pos{i}") for i in range(count))
+    assert table._data["position"].typecode == ("b" if count < 127 else "h")
+    codes = table.to_pandas()["position"].array.codes
+    assert np.shares_memory(codes, _view(table, "position"))
+
+
+def test_book_table_round_trip():
+    table = BookTable.from_lists(
+        ["A Light in the ...", "Tipping the Velvet"], ["€51.77", "€53.74"],
+        ["In stock", "In stock"], ["https://a", "https://b"],
+    )
+    assert table[1] == Book("Tipping the Velvet", 53.74, "In stock", "https://b")
+    assert table[0].availability is table[1].availability
+
+
+def test_append_rolls_back_while_exported():
+    pytest.importorskip("pandas")
+    table = PlayerTable([Player.from_raw(raw_row(0))])
+    df = table.to_pandas()
+    with pytest.raises(BufferError):
+        table.append(Player.from_raw(raw_row(1)))
+    assert len(table) == 1
+    del df
+    table.append(Player.from_raw(raw_row(1)))
+    assert table[1] == Player.from_raw(raw_row(1))
+
+
+@pytest.mark.parametrize("bad", [
+    Player(name="Bad", position="New position", height="1,80 m"),
+    Player(name="Bad", foot="right", age=40000),
+])
+def test_append_rolls_back_on_bad_value(bad):
+    good = Player.from_raw(raw_row(0))
+    table = PlayerTable([good])
+    with pytest.raises((TypeError, OverflowError)):
+        table.append(bad)
+    assert len(table) == 1
+    assert {len(column) for column in table._data.values()} == {1}
+    assert table._categories["position"] == [good.position]
+    table.append(Player(name="Next"))
+    assert list(table) == [good, Player(name="Next")]
+
+
+def _view(table, name):
+    import numpy as np
+
+    column = table._data[name]
+    return np.frombuffer(column, dtype=column.typecode)
+
+
+def test_to_pandas_shares_buffers():
+    np = pytest.importorskip("numpy")
+    pytest.importorskip("pandas")
+    table = PlayerTable(Player.from_raw(raw_row(i)) for i in range(50))
+    df = table.to_pandas()
+    assert np.shares_memory(df["market_value"].to_numpy(), _view(table, "market_value"))
+    assert np.shares_memory(df["height"].to_numpy(), _view(table, "height"))
+    assert np.shares_memory(df["birth_date"].to_numpy(), _view(table, "birth_date"))
+    assert np.shares_memory(df["age"].array._data, _view(table, "age"))
+    assert np.shares_memory(df["position"].array.codes, _view(table, "position"))
+    assert df["foot"].isna().sum() == 16
+    assert df["age"].iloc[0] == 20
+
+
+def test_to_arrow_shares_buffers():
+    pytest.importorskip("pyarrow")
+    table = PlayerTable(Player.from_raw(raw_row(i)) for i in range(50))
+    arrow = table.to_arrow()
+    for name in ("market_value", "age", "birth_date"):
+        data = arrow.column(name).chunk(0).buffers()[1]
+        assert data.address == _view(table, name).ctypes.data
+    indices = arrow.column("position").chunk(0).indices.buffers()[1]
+    assert indices.address == _view(table, "position").ctypes.data
+    assert arrow.column("foot").null_count == 16
+
+
+def test_memory_per_record_drops(tmp_path):
+    n = 20_000
+    path = tmp_path / "players.csv"
+    write_csv(path, n)
+
+    tracemalloc.start()
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del rows
+
+    tracemalloc.start()
+    table = PlayerTable.from_csv(path)
+    table_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    assert len(table) == n
+    # Dict-of-strings rows cost several times more per player
+    assert dict_bytes / n > 3 * (table_bytes / n)
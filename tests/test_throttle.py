@@ -0,0 +1,111 @@
+import time
+
+import pytest
+
+from throttle import AIMDController, Throttled, is_congestion_error
+
+
+class Response:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class HTTPError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(status_code)
+        self.response = Response(status_code, headers)
+
+
+def raise_(error):
+    raise error
+
+
+def test_is_congestion_error():
+    assert is_congestion_error(HTTPError(429))
+    assert is_congestion_error(HTTPError(503))
+    assert is_congestion_error(TimeoutError())
+    assert not is_congestion_error(HTTPError(404))
+    assert not is_congestion_error(ValueError())
+
+
+def test_increase_after_a_window_of_successes():
+    controller = AIMDController(initial=2, max_concurrency=4)
+    controller.delay = 0.4
+    controller.record_success(0.1)
+    assert controller.concurrency == 2
+    controller.record_success(0.1)
+    assert (controller.concurrency, controller.delay) == (3, 0.2)
+
+    for _ in range(3 + 4 + 4):
+        controller.record_success(0.1)
+    assert controller.concurrency == 4
+
+
+def test_429_halves_and_respects_retry_after():
+    controller = AIMDController(initial=8, backoff_delay=0.01)
+    with pytest.raises(HTTPError):
+        controller.call(raise_, HTTPError(429, {"Retry-After": "0.3"}))
+    assert controller.concurrency == 4
+    assert controller.stats["throttled"] == 1
+
+    start = time.monotonic()
+    controller.call(lambda: None)
+    assert time.monotonic() - start >= 0.25
+
+
+def test_404_does_not_back_off():
+    controller = AIMDController(initial=8)
+    with pytest.raises(HTTPError):
+        controller.call(raise_, HTTPError(404))
+    assert controller.concurrency == 8
+    assert controller.stats == dict(controller.stats, error=1, backoffs=0)
+
+
+def test_one_decrease_per_round_trip():
+    controller = AIMDController(initial=16, backoff_delay=0.01)
+    controller.record_success(0.2)
+    for _ in range(5):
+        controller.record_throttled()
+    assert (controller.concurrency, controller.stats["backoffs"]) == (8, 1)
+
+    time.sleep(0.25)
+    controller.record_throttled()
+    assert (controller.concurrency, controller.stats["backoffs"]) == (4, 2)
+
+
+def test_backoff_on_rising_latency():
+    controller = AIMDController(initial=8, backoff_delay=0.01)
+    controller.record_success(0.1)
+    for _ in range(3):
+        controller.record_success(1.0)
+    assert controller.stats["slow"] >= 1
+    assert controller.concurrency == 4
+
+
+def test_backoff_on_empty_page():
+    controller = AIMDController(initial=8, backoff_delay=0.01)
+    with pytest.raises(Throttled) as info:
+        controller.call(lambda url: "<html></html>", "http://x/p/1",
+                        is_empty=lambda page: "<h1>" not in page)
+    assert info.value.result == "<html></html>"
+    assert controller.stats["empty"] == 1
+    assert controller.concurrency == 4
+
+
+def test_scrape_adapts_to_throttling_server(local_site, capsys):
+    import cli
+
+    site = local_site(players=20, capacity=3, base_latency=0.02)
+
+    controller = AIMDController(max_concurrency=8, backoff_delay=0.05, max_delay=0.5)
+    players = cli.scrape_with_details(site.url + "/squad", controller)
+    capsys.readouterr()
+
+    assert len(players) == 20
+    assert all(p["height"] == "1,85 m" for p in players)
+    assert site.stats["blank"] + site.stats["429"] >= 1
+    assert controller.stats["backoffs"] >= 1
+    # The controller settles around what the server can take
+    assert controller.concurrency <= site.capacity + 2
+    assert site.stats["ok"] >= 20
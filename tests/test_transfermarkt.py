@@ -0,0 +1,70 @@
+import pytest
+
+import cli
+import throttle
+import transfermarkt
+from throttle import AIMDController
+
+
+PROFILES = {
+    # No info-table: height and foot come from Methods 2 and 3
+    "/p/header": ('<h1>Player</h1><span>1,79 m</span>'
+                  '<div><span>Foot:</span><span>left</span></div>'),
+    # Looks empty on every attempt, but the last fetch still has a height
+    "/p/bare": "<div><span>1,90 m</span></div>",
+    "/p/blank": "<html></html>",
+}
+
+
+@pytest.fixture
+def site(local_site):
+    """/squad with two players, /missing answers 404 and /busy always 503"""
+    return local_site(players=2, pages=dict(PROFILES, **{"/busy": 503}))
+
+
+def fast_controller():
+    return AIMDController(backoff_delay=0.01, max_delay=0.05)
+
+
+def test_details_scrape(site, tmp_path):
+    output = str(tmp_path / "players.csv")
+    assert cli.main(["--details", "--url", site.url + "/squad", "-o", output, "-q"]) == 0
+    with open(output, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert lines[0] == "name,age,position,height,foot,market_value"
+    assert len(lines) == 3
+    assert lines[1] == "Player 0,05/04/1991 (32),Goalkeeper,\"1,85 m\",right,€0.00m"
+
+
+@pytest.mark.parametrize("path", ["/missing", "/busy"])
+def test_squad_http_error_exits_cleanly(site, tmp_path, capsys, monkeypatch, path):
+    monkeypatch.setattr(throttle, "AIMDController",
+                        lambda max_concurrency: fast_controller())
+    output = tmp_path / "players.csv"
+    assert cli.main(["--details", "--url", site.url + path, "-o", str(output)]) == 1
+    assert "Could not find player table" in capsys.readouterr().out
+    assert not output.exists()
+
+
+def test_squad_retries_then_gives_up(site):
+    assert transfermarkt.get_squad_rows(site.url + "/busy", fast_controller()) is None
+    assert site.hits["/busy"] == 3
+    assert transfermarkt.get_squad_rows(site.url + "/missing", fast_controller()) is None
+    assert site.hits["/missing"] == 1
+
+
+def test_profile_without_info_table_is_not_empty(site):
+    details = transfermarkt.get_player_details(site.url + "/p/header", fast_controller())
+    assert details == {"height": "1,79 m", "foot": "left"}
+    assert site.hits["/p/header"] == 1
+
+
+def test_empty_profile_is_parsed_after_last_attempt(site):
+    controller = fast_controller()
+    details = transfermarkt.get_player_details(site.url + "/p/bare", controller)
+    assert details == {"height": "1,90 m", "foot": "N/A"}
+    assert site.hits["/p/bare"] == 3
+    assert controller.stats["empty"] == 3
+
+    details = transfermarkt.get_player_details(site.url + "/p/blank", controller)
+    assert details == {"height": "N/A", "foot": "N/A"}
@@ -0,0 +1,207 @@
+"""Adaptive (AIMD) concurrency control for page fetches
+
+Instead of a fixed sleep between requests, the controller keeps a
+concurrency limit and a delay between request starts and adjusts them from
+what it observes:
+
+- healthy responses with stable latency: after a full window of successes
+  (one per allowed slot) the limit grows by ``increase`` and the delay
+  halves (additive increase);
+- 429/503 responses, timeouts and connection errors, latency rising above
+  ``latency_factor`` times the best latency seen, or a page that parsed
+  empty (blank table / profile): the limit is multiplied by ``decrease``
+  and the delay doubles (multiplicative decrease). A ``Retry-After``
+  header pauses all new requests for that long.
+
+At most one decrease is applied per observed round trip, so a burst of
+failures from requests that were already in flight counts once.
+
+    controller = AIMDController(max_concurrency=8)
+    soup = controller.call(fetch, url, is_empty=lambda soup: soup.find("table") is None)
+"""
+import threading
+import time
+
+THROTTLE_STATUSES = (429, 503)
+
+
+class Throttled(Exception):
+    """Raised by AIMDController.call when the response looks throttled
+
+    ``result`` holds what was fetched (e.g. the empty-looking page), so a
+    caller out of retries can still use it.
+    """
+
+    def __init__(self, reason, url=None, result=None):
+        super().__init__(f"{reason}" + (f" for {url}" if url else ""))
+        self.reason = reason
+        self.result = result
+
+
+def _status_of(error):
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None)
+
+
+def _retry_after(error):
+    response = getattr(error, "response", None)
+    value = getattr(response, "headers", {}).get("Retry-After") if response is not None else None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def is_congestion_error(error):
+    """Timeouts and connection failures point at an overloaded server"""
+    if _status_of(error) in THROTTLE_STATUSES:
+        return True
+    name = type(error).__name__
+    return name in ("Timeout", "ConnectTimeout", "ReadTimeout", "ConnectionError",
+                    "TimeoutError", "ConnectionResetError")
+
+
+class AIMDController:
+    """Thread-safe AIMD limit on concurrent requests and request spacing"""
+
+    def __init__(self, initial=2, min_concurrency=1, max_concurrency=16,
+                 increase=1, decrease=0.5, min_delay=0.0, max_delay=30.0,
+                 backoff_delay=1.0, latency_factor=2.0, smoothing=0.3):
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.increase = increase
+        self.decrease = decrease
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.backoff_delay = backoff_delay
+        self.latency_factor = latency_factor
+        self.smoothing = smoothing
+
+        self.limit = float(min(max(initial, min_concurrency), max_concurrency))
+        self.delay = min_delay
+        self.latency = None        # smoothed latency (seconds)
+        self.best_latency = None
+        self.stats = {"success": 0, "throttled": 0, "slow": 0, "empty": 0,
+                      "error": 0, "backoffs": 0}
+
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._successes = 0
+        self._next_start = 0.0
+        self._last_backoff = 0.0
+
+    @property
+    def concurrency(self):
+        """Number of requests currently allowed in flight"""
+        return max(self.min_concurrency, int(self.limit))
+
+    # -- slots ---------------------------------------------------------------
+
+    def acquire(self):
+        """Block until a request may start"""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if self._in_flight < self.concurrency and now >= self._next_start:
+                    break
+                timeout = self._next_start - now if self._in_flight < self.concurrency else None
+                self._cond.wait(timeout)
+            self._in_flight += 1
+            self._next_start = now + self.delay
+
+    def release(self):
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    # -- feedback ------------------------------------------------------------
+
+    def record_success(self, latency):
+        with self._cond:
+            self.latency = latency if self.latency is None else (
+                self.smoothing * latency + (1 - self.smoothing) * self.latency
+            )
+            # The baseline creeps up slowly so one lucky fast response does
+            # not keep every later response looking "slow"
+            if self.best_latency is None:
+                self.best_latency = self.latency
+            else:
+                self.best_latency = min(self.latency, self.best_latency * 1.01)
+            if self.latency > self.latency_factor * self.best_latency:
+                self.stats["slow"] += 1
+                self._backoff()
+                return
+            self.stats["success"] += 1
+            self._successes += 1
+            if self._successes >= self.concurrency:
+                self._successes = 0
+                self.limit = min(self.max_concurrency, self.limit + self.increase)
+                self.delay = max(self.min_delay, self.delay / 2 if self.delay >= 0.02 else 0.0)
+            self._cond.notify_all()
+
+    def record_throttled(self, retry_after=None):
+        with self._cond:
+            self.stats["throttled"] += 1
+            self._backoff(retry_after)
+
+    def record_empty(self):
+        with self._cond:
+            self.stats["empty"] += 1
+            self._backoff()
+
+    def record_error(self):
+        """An error that says nothing about load (404, parse bug, ...)"""
+        with self._cond:
+            self.stats["error"] += 1
+
+    def _backoff(self, retry_after=None):
+        # Caller holds the lock
+        now = time.monotonic()
+        if retry_after:
+            self._next_start = max(self._next_start, now + min(retry_after, self.max_delay))
+        if now - self._last_backoff < (self.latency or 0.0):
+            return
+        self._last_backoff = now
+        self._successes = 0
+        self.stats["backoffs"] += 1
+        self.limit = max(self.min_concurrency, self.limit * self.decrease)
+        self.delay = min(self.max_delay, max(self.delay * 2, self.backoff_delay))
+        self._next_start = max(self._next_start, now + self.delay)
+
+    # -- wrapper -------------------------------------------------------------
+
+    def call(self, func, *args, is_empty=None, before=None):
+        """Run func(*args) inside a slot and feed the outcome back
+
+        ``before()`` runs once the slot is acquired, before the request is
+        timed (e.g. to wait for a rate limit shared with other processes).
+        Raises Throttled when is_empty(result) is true; exceptions from func
+        are re-raised after being classified.
+        """
+        self.acquire()
+        try:
+            if before is not None:
+                before()
+            start = time.monotonic()
+            try:
+                result = func(*args)
+            except Exception as e:
+                if is_congestion_error(e):
+                    self.record_throttled(_retry_after(e))
+                else:
+                    self.record_error()
+                raise
+            if is_empty is not None and is_empty(result):
+                self.record_empty()
+                raise Throttled("empty page", args[0] if args else None, result)
+            self.record_success(time.monotonic() - start)
+            return result
+        finally:
+            self.release()
+
+    def summary(self):
+        with self._cond:
+            latency = f"{self.latency * 1000:.0f} ms" if self.latency is not None else "n/a"
+            return (f"concurrency {self.concurrency}, delay {self.delay:.2f}s, "
+                    f"latency {latency}, " +
+                    ", ".join(f"{k}: {v}" for k, v in self.stats.items()))
@@ -0,0 +1,212 @@
+"""Transfermarkt squad and player profile scraping
+
+Shared by the CLI (cli.py) and the legacy scripts. requests and
+BeautifulSoup are imported on first use so that importing this module,
+or running `python cli.py --help`, stays cheap.
+"""
+import sys
+import time
+import random
+import re
+
+# URL de l'équipe nationale du Maroc sur Transfermarkt
+URL = "https://www.transfermarkt.com/morocco/kader/verein/3575/saison_id/2024/plus/1"
+BASE_URL = "https://www.transfermarkt.com"
+
+headers = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+}
+
+FOOT_VALUES = ["right", "left", "both", "right foot", "left foot", "both feet"]
+
+
+def _require():
+    """Import the scraping dependencies, exiting with a hint if missing"""
+    try:
+        import requests
+        from bs4 import BeautifulSoup
+    except ImportError as e:
+        print("Missing required Python package:", e)
+        print("Install dependencies with:")
+        print("    pip install -r requirements.txt")
+        sys.exit(1)
+    return requests, BeautifulSoup
+
+
+def get_soup(url):
+    """Download a page and parse it with BeautifulSoup"""
+    requests, BeautifulSoup = _require()
+    response = requests.get(url, headers=headers)
+    return BeautifulSoup(response.text, "html.parser")
+
+
+def fetch_soup(url, timeout=30):
+    """Like get_soup, but HTTP errors raise so callers can retry or back off"""
+    requests, BeautifulSoup = _require()
+    response = requests.get(url, headers=headers, timeout=timeout)
+    response.raise_for_status()
+    return BeautifulSoup(response.text, "html.parser")
+
+
+def squad_is_empty(soup):
+    """A squad page without the player table (blocked or throttled)"""
+    return soup.find("table", {"class": "items"}) is None
+
+
+def profile_is_empty(soup):
+    """A page with neither the player header nor any info-table entry
+    (blank, blocked or throttled); a profile missing only some fields is
+    not empty"""
+    return (soup.find("h1") is None
+            and soup.find("span", class_=re.compile(r"info-table__content")) is None)
+
+
+def _fetch_adaptive(url, controller, is_empty, attempts):
+    """Fetch through an AIMDController, retrying throttled responses
+
+    A page that still looks empty after the last attempt is returned anyway,
+    for the caller to parse what it can.
+    """
+    from throttle import Throttled, is_congestion_error
+
+    for attempt in range(1, attempts + 1):
+        try:
+            return controller.call(fetch_soup, url, is_empty=is_empty)
+        except Throttled as e:
+            if attempt == attempts:
+                return e.result
+        except Exception as e:
+            if attempt == attempts or not is_congestion_error(e):
+                raise
+
+
+def base_url_of(url):
+    """"https://host/a/b" -> "https://host", to resolve profile links"""
+    from urllib.parse import urlsplit
+
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def parse_squad_row(row, base_url=BASE_URL):
+    """Extract the basic fields of one squad table row
+
+    Returns (player dict, profile URL or None).
+    """
+    name_cell = row.find("td", {"class": "hauptlink"})
+    name = name_cell.get_text(strip=True)
+
+    position_tag = row.find("td", {"class": "zentriert"}).find("table")
+    position = ""
+    if position_tag:
+        position = position_tag.get_text(strip=True)
+
+    market_value_tag = row.find("td", {"class": "rechts hauptlink"})
+    market_value = market_value_tag.get_text(strip=True) if market_value_tag else "N/A"
+
+    age_tag = row.find_all("td", {"class": "zentriert"})
+    try:
+        age = age_tag[1].get_text(strip=True)
+    except IndexError:
+        age = "N/A"
+
+    player_url = None
+    player_link = name_cell.find("a")
+    if player_link and player_link.get("href"):
+        player_url = base_url + player_link.get("href")
+
+    player = {
+        "name": name,
+        "age": age,
+        "position": position,
+        "market_value": market_value
+    }
+    return player, player_url
+
+
+def get_squad_rows(url=URL, controller=None, attempts=3):
+    """Return the player rows of a squad page, or None if no table was found
+
+    With an AIMDController a missing table is treated as throttling: the
+    controller backs off and the page is fetched again, up to `attempts` times.
+    HTTP errors that persist after the retries (404, 429/503) also give None.
+    """
+    if controller is None:
+        soup = get_soup(url)
+    else:
+        try:
+            soup = _fetch_adaptive(url, controller, squad_is_empty, attempts)
+        except Exception as e:
+            print(f"  ⚠ Error fetching squad page: {e}")
+            return None
+    table = soup.find("table", {"class": "items"})
+    if not table:
+        return None
+    return table.find_all("tr", {"class": ["odd", "even"]})
+
+
+def parse_player_details(soup):
+    """Extract height and preferred foot from a parsed profile page"""
+    details = {
+        "height": "N/A",
+        "foot": "N/A"
+    }
+
+    # Method 1: Look for info-table with different possible structures
+    info_sections = soup.find_all("span", class_=re.compile(r"info-table__content"))
+
+    for span in info_sections:
+        text = span.get_text(strip=True)
+
+        # Height detection - look for pattern like "1,85 m" or "185 cm"
+        if re.search(r'\d[,\.]\d{2}\s*m', text) or re.search(r'\d{3}\s*cm', text):
+            details["height"] = text
+
+        # Foot detection - look for common foot values
+        if text.lower() in FOOT_VALUES:
+            details["foot"] = text
+
+    # Method 2: Try to find data in the player's header section
+    if details["height"] == "N/A":
+        # Look for all text containing height patterns
+        for span in soup.find_all("span"):
+            text = span.get_text(strip=True)
+            if re.search(r'\d[,\.]\d{2}\s*m', text):
+                details["height"] = text
+                break
+
+    # Method 3: Look for foot in labels
+    if details["foot"] == "N/A":
+        labels = soup.find_all(string=re.compile(r"Foot", re.IGNORECASE))
+        for label in labels:
+            parent = label.find_parent()
+            if parent:
+                next_elem = parent.find_next_sibling()
+                if next_elem:
+                    foot_text = next_elem.get_text(strip=True)
+                    if foot_text.lower() in ["right", "left", "both"]:
+                        details["foot"] = foot_text
+                        break
+
+    return details
+
+
+def get_player_details(player_url, controller=None, attempts=3):
+    """Scrape detailed player information from their profile page
+
+    Without a controller, requests are spaced by a fixed 1-2 s sleep. With an
+    AIMDController the pace follows the server, and blank profiles are
+    fetched again before parsing the last one.
+    """
+    try:
+        if controller is None:
+            time.sleep(random.uniform(1, 2))  # Be respectful with requests
+            return parse_player_details(get_soup(player_url))
+        soup = _fetch_adaptive(player_url, controller, profile_is_empty, attempts)
+        return parse_player_details(soup)
+    except Exception as e:
+        print(f"  ⚠ Error scraping details: {e}")
+        return {
+            "height": "N/A",
+            "foot": "N/A"
+        }
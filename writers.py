@@ -0,0 +1,66 @@
+"""Lightweight output writers for scraped rows (no pandas needed)
+
+Rows are plain dicts, as built by the scrapers. The CSV output matches what
+`pd.DataFrame(rows).to_csv(path, index=False)` used to produce.
+"""
+import csv
+import json
+import os
+
+
+def _fieldnames(rows):
+    fields = []
+    for row in rows:
+        for key in row:
+            if key not in fields:
+                fields.append(key)
+    return fields
+
+
+def write_csv(rows, path, encoding="utf-8"):
+    """Write rows to a CSV file with a header line"""
+    with open(path, "w", newline="", encoding=encoding) as f:
+        writer = csv.DictWriter(f, fieldnames=_fieldnames(rows))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def write_jsonl(rows, path, encoding="utf-8"):
+    """Write rows to a JSON Lines file, one object per line"""
+    with open(path, "w", encoding=encoding) as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False, default=str))
+            f.write("\n")
+
+
+def write_rows(rows, path, fmt=None, encoding="utf-8"):
+    """Write rows as CSV or JSONL, guessing the format from the extension"""
+    if fmt is None:
+        fmt = "jsonl" if os.path.splitext(path)[1].lower() in (".jsonl", ".ndjson") else "csv"
+    if fmt == "jsonl":
+        write_jsonl(rows, path, encoding=encoding)
+    elif fmt == "csv":
+        write_csv(rows, path, encoding=encoding)
+    else:
+        raise ValueError(f"Unknown output format: {fmt!r}")
+
+
+def format_table(rows):
+    """Render rows as an aligned text table, like DataFrame.to_string()"""
+    fields = _fieldnames(rows)
+    if not fields:
+        return "(no rows)"
+    index_width = len(str(len(rows) - 1))
+    cells = [[str(row.get(field, "")) for field in fields] for row in rows]
+    widths = [
+        max([len(field)] + [len(line[i]) for line in cells])
+        for i, field in enumerate(fields)
+    ]
+    lines = [" " * index_width + "  " + "  ".join(
+        field.rjust(width) for field, width in zip(fields, widths)
+    )]
+    for idx, line in enumerate(cells):
+        lines.append(str(idx).ljust(index_width) + "  " + "  ".join(
+            cell.rjust(width) for cell, width in zip(line, widths)
+        ))
+    return "\n".join(lines)